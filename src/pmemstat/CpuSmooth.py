@@ -8,11 +8,48 @@ Class for fetching CPU usage from processes.
 # pylint: disable=consider-using-with,too-many-statements
 import os
 import time
-import re
 import traceback
 import math
+import functools
+from collections import deque
 from types import SimpleNamespace
 
+# for bytes.strip() in place of re.sub() w/ r'^\W+' and r'\W+$' (ASCII only)
+NONWORD_BYTES = bytes(ordinal for ordinal in range(128)
+                      if not (chr(ordinal).isalnum() or chr(ordinal) == '_'))
+INTERPRETERS = frozenset(('python', 'python2', 'python3', 'perl', 'bash', 'ruby',
+                    'sh', 'ksh', 'zsh'))
+try:
+    CLOCK_TICK = os.sysconf('SC_CLK_TCK') # clock ticks/sec
+except (ValueError, OSError):
+    CLOCK_TICK = 0
+if CLOCK_TICK <= 0: # fake it
+    CLOCK_TICK = 100
+
+@functools.lru_cache(maxsize=4096)
+def nickname_of(argv0, argv1):
+    """ Map the first two /proc/<pid>/cmdline arguments (as bytes) to a
+    nickname. Memoized since respawning children commonly share the same
+    ones. Works on bytes and decodes only the result."""
+    wds = os.path.basename(argv0).split() + [argv1]
+    nickname = wds.pop(0).strip(NONWORD_BYTES).decode('utf-8', 'replace')
+    if nickname in INTERPRETERS and wds:
+        script = os.path.basename(wds[0])
+        if script != wds[0]:
+            nickname = f'{nickname}->{script.decode("utf-8", "replace")}'
+    return nickname
+
+def list_pid_dirs():
+    """ The (pid, inode) of each /proc/<pid> directory. os.scandir walks the
+    getdents64 records in C, and the inode rides along (no stat needed)."""
+    pid_dirs = []
+    with os.scandir('/proc') as it:
+        for entry in it:
+            name = entry.name
+            if '0' <= name[0] <= '9': # PID dirs only
+                pid_dirs.append((int(name), entry.inode()))
+    return pid_dirs
+
 class Term:
     """ Escape sequences; e.g., see:
      - https://en.wikipedia.org/wiki/ANSI_escape_code
@@ -43,13 +80,12 @@ class SysStat:
     """ TBD """
     singleton = None
     def __init__(self):
-        self.fh = None
+        self.fd = None # raw fd of /proc/stat (kept open)
+        self.read_size = 8192 # enough for the 'cpu' lines; doubled if not
         self.prev = None
         self.delta = None
-        self.clock_tick = 100
         assert not self.singleton, 'cannot instantiate two SysStat'
         SysStat.singleton = self
-        self._set_clock_tick()
         self._refresh()
 
     @staticmethod
@@ -57,15 +93,6 @@ class SysStat:
         """ Return THE SysStat object"""
         return SysStat.singleton if SysStat.singleton else SysStat()
 
-    def _set_clock_tick(self):
-        if self.clock_tick is None:
-            try:
-                self.clock_tick = os.sysconf(os.sysconf_names['SC_CLK_TCK'])
-            except Exception:
-                pass
-            if self.clock_tick <= 0: # fake it
-                self.clock_tick = 100
-
     @staticmethod
     def refresh():
         """ TBD """
@@ -74,37 +101,40 @@ class SysStat:
 
     def _refresh(self):
         """ TBD """
-        if not self.fh:
-            pathname = '/proc/stat'
-            self.fh = open(pathname, "r", encoding='utf-8')
-        self.fh.seek(0)
+        if self.fd is None:
+            self.fd = os.open('/proc/stat', os.O_RDONLY)
+        while True: # the 'cpu' lines lead the file; read just past them
+            buf = os.pread(self.fd, self.read_size, 0)
+            # no later line starts w/ 'cpu', so the last such ends the block
+            end = buf.find(b'\n', buf.rfind(b'\ncpu') + 1)
+            # done at EOF or once the line after them is surely not a 'cpu' line
+            if len(buf) < self.read_size or 0 <= end < len(buf) - 3:
+                break
+            self.read_size *= 2
 
         ns = SimpleNamespace(mono=time.monotonic(),
                     cpu_cnt=0, percent=0, ticks=0)
         delta = SimpleNamespace(**vars(ns))
 
-        for line in self.fh:
-            wds = line.split()
-            keyword = wds[0]
-            if keyword == 'cpu':
-                ns.ticks = int(wds[1])
-                ns.ticks += int(wds[3])
-                # needed for VM to normalize the %cpu per process
-                ns.gross_ticks = sum(int(val) for val in wds[1:])
-            elif keyword.startswith('cpu'):
-                ns.cpu_cnt += 1
+        # only the leading 'cpu ' line (the sum over all CPUs) is split;
+        # the 'cpuN' lines after it are just counted
+        wds = buf[:buf.find(b'\n')].split()
+        ns.ticks = int(wds[1]) + int(wds[3])
+        # needed for VM to normalize the %cpu per process
+        ns.gross_ticks = sum(map(int, wds[1:]))
+        ns.cpu_cnt = buf.count(b'\ncpu', 0, end if end >= 0 else len(buf))
 
         if self.prev:
             prev = self.prev
             delta.mono = round(ns.mono - prev.mono, 4)
             delta.ticks = ns.ticks - prev.ticks
             delta.cpu_cnt = ns.cpu_cnt
-            delta.max_ticks = math.ceil(self.clock_tick
+            delta.max_ticks = math.ceil(CLOCK_TICK
                                 * delta.mono * ns.cpu_cnt)
             delta.gross_ticks = ns.gross_ticks - prev.gross_ticks
             if delta.mono > 0:
                 delta.percent = round(100
-                    * delta.ticks / self.clock_tick / delta.mono, 4)
+                    * delta.ticks / CLOCK_TICK / delta.mono, 4)
         self.prev = ns
         self.delta = delta
         return delta
@@ -112,7 +142,6 @@ class SysStat:
 
 class CpuSmooth:
     """Class that get smoothed CPU percent of given process"""
-    clock_tick = None  # number of clock ticks/sec
     prev_system_stats = None
     prev_system_delta = None
 
@@ -122,27 +151,28 @@ class CpuSmooth:
         self.DB = DB
         self.db_info = ''  # describe last update
         self.avg_secs = avg_secs # smoothing interval
-        self.fh = None
+        self.fd = None # raw fd of /proc/<pid>/stat (kept open)
         self.stat_ns = None # last read status
         self.percent = 0 # smoothed percent
-        self.hists = []
+        self.hists = deque() # of (ticks, mono_ns, gross_ticks); oldest first
         self.nickname = '' # crudely fetched on demand (for test)
         self.sys_stat = SysStat.get_singleton()
 
     def __del__(self):
-        if self.fh:
+        self.close()
+
+    def close(self):
+        """ Release the kept /proc/<pid>/stat fd; call when the PID is gone
+        rather than waiting on garbage collection to reach __del__."""
+        if self.fd is not None:
             try:
-                self.fh.close()
+                os.close(self.fd)
             except Exception:
                 pass
+            self.fd = None
 
     def _set_error(self):
-        if self.fh:
-            try:
-                self.fh.close()
-            except Exception:
-                pass
-            self.fh = None
+        self.close()
         self.percent, self.error = 0, True
         return self.percent
 
@@ -150,94 +180,116 @@ class CpuSmooth:
         """ Get the nickname of the process (crude)."""
         if self.nickname:
             return self.nickname
-        cmdline_file = f'/proc/{self.pid}/cmdline'
-        arguments, nickname = [], ''
+        nickname = ''
         try:
-            # pylint: disable=consider-using-with
-            with open(cmdline_file, encoding='utf-8') as fh:
-                for line in fh:
-                    arguments = line.split('\0')
-                    break
+            fd = os.open(f'/proc/{self.pid}/cmdline', os.O_RDONLY)
+            try:
+                raw = os.read(fd, 4096) # only argv[0] and argv[1] matter
+            finally:
+                os.close(fd)
+            if raw:
+                argv = raw.split(b'\0', 2) # only argv[0] and argv[1]
+                nickname = nickname_of(argv[0], argv[1] if len(argv) > 1 else b'')
         except Exception:
             pass
-        if arguments:
-            wds = os.path.basename(arguments[0]).split() + arguments[1:]
-            nickname = re.sub(r'^\W+', '', wds.pop(0))
-            nickname = re.sub(r'\W+$', '', nickname)
-            # DB(0, f'basename={basename} wds={wds}')
-            if nickname in ('python', 'python2', 'python3', 'perl', 'bash', 'ruby',
-                    'sh', 'ksh', 'zsh') and wds:
-                script = os.path.basename(wds[0])
-                # DB(0, f'script={script} wds[0]={wds[0]}')
-                if script != wds[0]:
-                    nickname = f'{nickname}->{script}'
-        if not nickname:
-            ns = self.stat_ns if self.stat_ns else self._get_stat()
-            if ns and ns.exec:
-                nickname = ns.exec
+        if not nickname: # e.g., a kernel thread; use '(comm)' as would ps
+            try:
+                with open(f'/proc/{self.pid}/comm', 'rb') as fh:
+                    comm = fh.read().rstrip(b'\n')
+                if comm:
+                    nickname = f"({comm.decode(errors='replace')})"
+            except Exception:
+                pass
         self.nickname = nickname
         return nickname
 
     def _get_stat(self):
-        if not self.fh:
+        if self.fd is None:
             try:
-                # pylint: disable=consider-using-with
-                self.fh = open(f'/proc/{self.pid}/stat', encoding='utf-8')
+                self.fd = os.open(f'/proc/{self.pid}/stat', os.O_RDONLY)
             except (PermissionError, FileNotFoundError):
                 return self._set_error()
         try:
-            self.fh.seek(0)
-            data = self.fh.read().split()
-            self.stat_ns = SimpleNamespace(exec=data[1],
-                             user=int(data[13]), system=int(data[14]),
-                             nthr=int(data[19]))
+            buf = os.pread(self.fd, 1024, 0)
+            # comm may hold spaces/parens, so split after its final ')'
+            # data[0] is field 3 (state); stop splitting past stime (field 15)
+            # so the ~37 trailing fields stay one unparsed bytes object
+            data = buf[buf.rindex(b')')+2:].split(None, 13)
+            # only the two fields every sample needs (no comm decode per tick)
+            self.stat_ns = SimpleNamespace(user=int(data[11]), system=int(data[12]))
         except Exception:
             self._set_error()
         return self.stat_ns
 
-    def refresh_cpu(self):
-        """Get the Cpu Number for the PID (if possible)"""
-        def pct(hist0, hist1):
-            delta_ticks = abs(hist0[0] - hist1[0])
-            delta_mono = abs(hist0[1] - hist1[1])
-            delta_gross_ticks = abs(hist0[2] - hist1[2])
-
-            percent = 0
-            cpu_cnt = self.sys_stat.prev.cpu_cnt
-            if delta_gross_ticks > 0:
-                percent = cpu_cnt * 100 * delta_ticks / delta_gross_ticks
-
-            return percent, delta_ticks, delta_mono
-        def pct_str(triple):
-            return f'{triple[0]:7.3f}%,{triple[1]:5d},{triple[2]:7.4f}s'
-#       def adjust_down(delta_ticks):
-#           """ Lower current ticks by amount ... meaning add to all
-#               previous ticks"""
-#           for hist in self.hists[:-1]:
-#               hist[0] += delta_ticks
+    @staticmethod
+    def refresh_all(cpus):
+        """Refresh a batch of CpuSmooth objects in one pass; all samples
+        share one timestamp so they line up with the SysStat snapshot.
+        Returns the summed percent of the batch."""
+        mono_ns, total, pread = time.monotonic_ns(), 0, os.pread
+        gross_ticks = SysStat.get_singleton().prev.gross_ticks
+        for cpu in cpus:
+            if cpu.fd is None or cpu.error or cpu.DB: # the uncommon cases
+                cpu.refresh_cpu(mono_ns=mono_ns)
+            else: # the steady state, with _get_stat() inlined and no namespace
+                try:
+                    buf = pread(cpu.fd, 1024, 0)
+                    data = buf[buf.rindex(b')')+2:].split(None, 13)
+                    ticks = int(data[11]) + int(data[12])
+                except Exception:
+                    cpu._set_error()
+                else:
+                    cpu._push_sample(ticks, mono_ns, gross_ticks)
+            total += cpu.percent
+        return total
+
+    def _pct(self, hist0, hist1):
+        """ Percent (and deltas) between two history samples."""
+        delta_ticks = hist0[0] - hist1[0] # hist0 is the newer sample
+        delta_mono = (hist0[1] - hist1[1]) / 1e9
+        delta_gross_ticks = hist0[2] - hist1[2]
+
+        percent = 0
+        cpu_cnt = self.sys_stat.prev.cpu_cnt
+        if delta_gross_ticks > 0:
+            percent = cpu_cnt * 100 * delta_ticks / delta_gross_ticks
+
+        return percent, delta_ticks, delta_mono
+
+    @staticmethod
+    def _pct_str(triple):
+        return f'{triple[0]:7.3f}%,{triple[1]:5d},{triple[2]:7.4f}s'
+
+    def _push_sample(self, ticks, mono_ns, gross_ticks):
+        """Add a sample to the history and recompute the smoothed percent;
+        returns whether it was recomputed."""
+        hists = self.hists
+        hists.append((ticks, mono_ns, gross_ticks))
+
+        if len(hists) < 2: # takes two to tango
+            return False
+        floor_ns = mono_ns - int(self.avg_secs * 1_000_000_000)
+        while len(hists) > 2 and hists[0][1] < floor_ns:
+            hists.popleft()
+        if mono_ns <= hists[-2][1]:
+            hists.pop()
+            return False
 
+        first = hists[0]
+        delta_gross_ticks = gross_ticks - first[2]
+        self.percent = (self.sys_stat.prev.cpu_cnt * 100 * (ticks - first[0])
+                        / delta_gross_ticks) if delta_gross_ticks > 0 else 0
+        return True
+
+    def refresh_cpu(self, mono_ns=None):
+        """Get the Cpu Number for the PID (if possible)"""
         if self.error or not self._get_stat():
             return self.percent
-        ticks = self.stat_ns.user + self.stat_ns.system
-        mono = time.monotonic()
-        gross_ticks = self.sys_stat.prev.gross_ticks
-        self.hists.append([ticks, mono, gross_ticks])
-
-        if len(self.hists) < 2: # takes two to tango
-            return 0
-        floor_mono = mono - self.avg_secs
-        while len(self.hists) > 2 and self.hists[0][1] < floor_mono:
-            self.hists.pop(0)
-        try:
-            _, _, delta_mono = pct(self.hists[-1], self.hists[-2])
-        except Exception:
-            pass
-        if delta_mono <= 0.0:
-            self.hists.pop()
+        mono_ns = time.monotonic_ns() if mono_ns is None else mono_ns
+        if not self._push_sample(self.stat_ns.user + self.stat_ns.system,
+                                 mono_ns, self.sys_stat.prev.gross_ticks):
             return 0
 
-        self.percent, _, _ = pct(self.hists[-1], self.hists[0])
-
         # print(f'{self.percent}%')
         if self.DB:
             deltas = []
@@ -245,15 +297,15 @@ class CpuSmooth:
             for idx in range(len(hists)-1, 0, -1):
                 hist, prev = hists[idx], hists[idx-1]
                 deltas.append(f'{hist[0]-prev[0]}'
-                               + f'/{hist[1]-prev[1]:.2f}'
+                               + f'/{(hist[1]-prev[1])/1e9:.2f}'
                                # + ('' if hist[2] <= 1 else f'#{hist[2]}')
                                )
             self.db_info = ' '
             if len(hists) >= 2:
                 self.db_info = ' '.join([
                       f'{self.get_nickname()[:16]:>16} {self.pid:>6d}',
-                      pct_str(pct(self.hists[-1], self.hists[-2])),
-                      '//', pct_str(pct(self.hists[-1], self.hists[0])),
+                      self._pct_str(self._pct(self.hists[-1], self.hists[-2])),
+                      '//', self._pct_str(self._pct(self.hists[-1], self.hists[0])),
                         ' '.join(deltas)])
         # if self.nickname == 'firefox':
             # print(self.nickname, self.hists)
@@ -263,6 +315,7 @@ if __name__ == '__main__':
     def main():
         """Main loop"""
         import argparse
+        import heapq
         parser = argparse.ArgumentParser()
         parser.add_argument('-t', '--top', type=int, default=10,
                 help='number of top CPU entries to show')
@@ -278,17 +331,28 @@ if __name__ == '__main__':
         spots = [] # where to put the top items
         cpus = {}
         losers = set()
-        pids = set()
+        inodes = {} # /proc/<pid> inode by pid; a new inode means pid reuse
         start_mono = time.monotonic()
+        rewind = '' # moves the cursor back over the prior frame
         sys_stat = SysStat.get_singleton()
         while True:
-            with os.scandir('/proc') as it:
-                for entry in it:
-                    # if re.match(r'^\d+$', entry.name):
-                    if entry.name.isdigit():
-                        pids.add(int(entry.name))
+            pids = set() # the live pids of this pass
+            for pid, ino in list_pid_dirs():
+                if inodes.get(pid, ino) != ino:
+                    cpu = cpus.pop(pid, None) # start over w/ new process
+                    if cpu:
+                        cpu.close()
+                    losers.discard(pid)
+                inodes[pid] = ino
+                pids.add(pid)
+            for dead in cpus.keys() - pids: # prune exited processes
+                cpus.pop(dead).close()
+            for dead in inodes.keys() - pids:
+                del inodes[dead]
+            losers &= pids
             old_losers, losers = losers, set()
             sys_stat.refresh()
+            batch = []
             for pid in pids:
                 if pid in old_losers:
                     losers.add(pid)
@@ -302,16 +366,14 @@ if __name__ == '__main__':
                 if cpu.error:
                     losers.add(pid)
                     continue
-                cpu.refresh_cpu()
-            top_cpus = sorted(cpus.values(), key=lambda x: x.percent, reverse=True)
-            top_cpus = top_cpus[:opts.top]
+                batch.append(cpu)
+            total_pct = CpuSmooth.refresh_all(batch)
+            top_cpus = heapq.nlargest(opts.top, cpus.values(),
+                                      key=lambda x: x.percent)
             top_cpus = sorted(top_cpus, key=lambda x: x.pid)
             run_time = time.monotonic()-start_mono
-            total_pct = 0
-            for cpu in cpus.values():
-                total_pct += cpu.percent
-            print(f'--------- {run_time:6.1f}s {total_pct:7.2f}% ----------- ',
-                  f'{sys_stat.delta}' + Term.erase_to_eol())
+            frame = [rewind, f'--------- {run_time:6.1f}s {total_pct:7.2f}% ----------- ',
+                  f' {sys_stat.delta}' + Term.erase_to_eol() + '\n']
             old_spots, spots, todo = spots, [None]*opts.top, set()
             for cpu in top_cpus:
                 try:
@@ -323,11 +385,11 @@ if __name__ == '__main__':
                 if not cpu:
                     cpu = todo.pop()
                     spots[idx] = cpu
-                print(cpu.db_info + Term.erase_to_eol())
+                frame.append(cpu.db_info + Term.erase_to_eol() + '\n')
+            os.writev(1, [line.encode() for line in frame]) # one write per frame
+            rewind = (Term.pos_up(1) + '\r') * (1+len(top_cpus))
 
             time.sleep(loop_secs)
-            up_one = Term.pos_up(1) + '\r'
-            print(up_one * (2+len(top_cpus)))
 
     try:
         main()
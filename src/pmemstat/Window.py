@@ -6,14 +6,21 @@ Custom Wrapper for python curses.
 # pylint: disable=too-many-instance-attributes,too-many-arguments
 # pylint: disable=invalid-name,broad-except,too-many-branches
 
+import os
 import traceback
 import atexit
 import time
+import sys
+import select
 import curses
 import textwrap
 from types import SimpleNamespace
 from curses.textpad import rectangle, Textbox
 dump_str = None
+# curses constants used per row/frame, bound once (saves the module lookups);
+# the ACS_* ones exist only after initscr(), so _start_curses() sets them
+A_NORMAL, A_REVERSE = curses.A_NORMAL, curses.A_REVERSE
+HLINE, HLINE_REVERSE = ord('-'), ord('-') | A_REVERSE
 
 class OptionSpinner:
     """Manage a bunch of options where the value is rotate thru
@@ -36,6 +43,7 @@ class OptionSpinner:
         self.attr_to_option = {} # given an attribute, find its option ns
         self.key_to_option = {} # given key, options namespace
         self.keys = set()
+        self.comment_lead = '' # help line prefix of comments (per align)
 
     @staticmethod
     def _make_option_ns():
@@ -47,6 +55,9 @@ class OptionSpinner:
             vals=None,
             prompt=None,
             comments=[],
+            descr_line='', # help line prefix (per align)
+            shown=(), # help text per value of vals
+            next_val={}, # value => the value after it in vals
         )
 
     def get_value(self, attr, coerce=False):
@@ -74,9 +85,26 @@ class OptionSpinner:
             self.key_to_option[key] = ns
             self.keys.add(key)
         self.options.append(ns)
-        self.align = max(self.align, self.margin+len(ns.descr))
+        align = max(self.align, self.margin+len(ns.descr))
+        # the help text is static but for the current values, so format
+        # it here (and again for all when the alignment grows)
+        for opt in (self.options if align != self.align or not self.comment_lead
+                    else [ns]):
+            opt.descr_line = f'{opt.descr:>{align}}: '
+        self.align, self.comment_lead = align, f'{"":>{align}}:  '
+        ns.shown = tuple(self._shown(val) for val in ns.vals or ())
+        vals = ns.vals or ()
+        for idx in reversed(range(len(vals))): # (first of equal values wins)
+            ns.next_val[vals[idx]] = vals[(idx+1) % len(vals)]
         self.get_value(ns.attr, coerce=True)
 
+    @staticmethod
+    def _shown(value):
+        """How the help page shows a value"""
+        if isinstance(value, bool):
+            return "ON" if value else "off"
+        return f'{value}'
+
     def add(self, obj, specs):
         """ Compatibility Method."""
         for spec in specs:
@@ -112,9 +140,8 @@ class OptionSpinner:
 
     def show_help_nav_keys(self, win):
         """ Get/present standard verbiage for the navigation keys"""
-        for line in Window.get_nav_keys_blurb().splitlines():
-            if line:
-                win.add_header(line)
+        for line in Window.nav_key_lines:
+            win.add_header(line)
 
     def show_help_body(self, win):
         """ Write the help page section."""
@@ -126,18 +153,16 @@ class OptionSpinner:
             assert value is not None, f'cannot get value of {repr(ns.attr)}'
             choices = ns.vals if ns.vals else [value]
 
-            win.add_body(f'{ns.descr:>{self.align}}: ')
+            win.add_body(ns.descr_line)
 
-            for choice in choices:
-                shown = f'{choice}'
-                if isinstance(choice, bool):
-                    shown = "ON" if choice else "off"
+            for choice, shown in zip(choices, ns.shown if ns.vals
+                                     else (self._shown(value),)):
                 win.add_body(' ', resume=True)
                 win.add_body(shown, resume=True,
-                    attr=curses.A_REVERSE if choice == value else None)
+                    attr=A_REVERSE if choice == value else None)
 
             for comment in ns.comments:
-                win.add_body(f'{"":>{self.align}}:  {comment}')
+                win.add_body(f'{self.comment_lead}{comment}')
 
     def do_key(self, key, win):
         """Do the automated processing of a key."""
@@ -146,8 +171,7 @@ class OptionSpinner:
             return None
         value = self.get_value(ns.attr)
         if ns.vals:
-            idx = ns.vals.index(value) if value in ns.vals else -1
-            value = ns.vals[(idx+1) % len(ns.vals)] # choose next
+            value = ns.next_val.get(value, ns.vals[0]) # choose next
         else:
             value = win.answer(prompt=ns.prompt, seed=value)
         setattr(ns.obj, ns.attr, value)
@@ -155,57 +179,111 @@ class OptionSpinner:
 
 class Window:
     """ Layer above curses to encapsulate what we need """
-    timeout_ms = 200
+    __slots__ = ('scr', 'rows', 'cols', 'head', 'body', 'hor_line_cnt',
+                 'scroll_pos', 'max_scroll_pos', 'scroll_view_size', 'body_base',
+                 'pick_pos', 'last_pick_pos', 'last_scroll_pos', 'pick_mode',
+                 'pick_size', 'handled_keys', 'dirty', 'dirty_rows',
+                 'last_resize_check', 'rewritten', 'last_row_cnts',
+                 'hor_line_drawn', 'drawn_mono')
+    timeout_ms = 500 # longest idle wait for input (so resizes get noticed)
+    frame_secs = 1/60 # shortest time between drawing scrolls (caps the rate)
     static_scr = None
-    nav_keys = """
+    nav_keys = textwrap.dedent("""
         Navigation:    H/M/L:   top/middle/end-of-page
             k, UP:  up one row               0, HOME:  first row
           j, DOWN:  down one row              $, END:  last row
            Ctrl-u:  half-page up       Ctrl-b, PPAGE:  page up
            Ctrl-d:  half-page down     Ctrl-f, NPAGE:  page down
-    """
+    """) # dedented once, at import
+    nav_key_lines = tuple(line for line in nav_keys.splitlines() if line)
+    # bits of Window.dirty: what changed since the last render
+    DIRTY_HEAD, DIRTY_BODY, DIRTY_SCROLL = 0x1, 0x2, 0x4
+    DIRTY_ALL = DIRTY_HEAD | DIRTY_BODY | DIRTY_SCROLL
+
+    # navigation keys (built once): moves by rows (times pick_size), moves
+    # by fractions of the view, and jumps computed from (window, view)
+    nav_row_moves = {ord('k'): -1, curses.KEY_UP: -1,
+                     ord('j'): 1, curses.KEY_DOWN: 1}
+    nav_page_moves = {2: -1.0, curses.KEY_PPAGE: -1.0, 21: -0.5, # ctl-b,u
+                      6: 1.0, curses.KEY_NPAGE: 1.0, 4: 0.5} # ctl-f,d
+    nav_jumps = {
+        ord('0'): lambda win, view: 0,
+        curses.KEY_HOME: lambda win, view: 0,
+        ord('$'): lambda win, view: win.body.row_cnt - 1,
+        curses.KEY_END: lambda win, view: win.body.row_cnt - 1,
+        ord('H'): lambda win, view: win.scroll_pos,
+        ord('M'): lambda win, view: win.scroll_pos + view//2,
+        ord('L'): lambda win, view: win.scroll_pos + view-1,
+    }
+    # all of them by key, so prompt() needs one lookup per key:
+    # (rows, pages, jump) with the two not applying set to None
+    nav_moves = dict(
+        [(key, (rows, None, None)) for key, rows in nav_row_moves.items()]
+        + [(key, (None, pages, None)) for key, pages in nav_page_moves.items()]
+        + [(key, (None, None, jump)) for key, jump in nav_jumps.items()])
+
     def __init__(self, head_line=True, head_rows=50, body_rows=200,
                  body_cols=200, keys=None, pick_mode=False, pick_size=1):
         self.scr = self._start_curses()
+        self.rows, self.cols = self.scr.getmaxyx()
 
+        # pads start about screen-sized and grow on demand up to rows x cols
         self.head = SimpleNamespace(
-            pad=curses.newpad(head_rows, body_cols),
+            pad=None,
             rows=head_rows,
             cols=body_cols,
+            pad_rows=0, pad_cols=0, # allocated size of pad
             row_cnt=0,  # no. head rows added
-            texts = [],
+            end_x=0,  # column where the last text added ended
+            shown=[], # per pad row, what _add() last wrote (None if unknown,
+                      # False if blank); sized by _fit_pad() w/ the pad
             view_cnt=0,  # no. head rows viewable (NOT in body)
         )
         self.body = SimpleNamespace(
-            pad = curses.newpad(body_rows, body_cols),
+            pad=None,
             rows= body_rows,
             cols=body_cols,
+            pad_rows=0, pad_cols=0,
             row_cnt = 0,
-            texts = []
+            end_x=0,
+            shown=[],
         )
         self.hor_line_cnt = 1 if head_line else 0 # no. h-lines in header
         self.scroll_pos = 0  # how far down into body are we?
         self.max_scroll_pos = 0
         self.pick_pos = 0 # in highlight mode, where are we?
         self.last_pick_pos = -1 # last highlighted position
+        self.last_scroll_pos = -1 # scroll_pos of the last render
+        self.dirty_rows = set() # body rows re-highlighted since last render
         self.pick_mode = pick_mode # whether in highlight mode
         self.pick_size = pick_size # whether in highlight mode
-        self.rows, self.cols = 0, 0
         self.scroll_view_size = 0  # no. viewable lines of the body
         self.handled_keys = set(keys) if isinstance(keys, (set, list)) else []
-        self._set_screen_dims()
+        self.dirty = self.DIRTY_ALL
+        self.rewritten = True # whether any pad row changed since the last render
+        self.last_row_cnts = None # (head, body) row_cnt of the last render
+        self.hor_line_drawn = None # (row, cols, bot, cnt) of the line on the screen
+        self.drawn_mono = 0.0 # when the screen was last written (monotonic)
+        self.last_resize_check = 0.0 # when prompt() last polled the tty size
+        self._fit_pad(self.head)
+        self._fit_pad(self.body)
         self.calc()
 
     @staticmethod
     def get_nav_keys_blurb():
         """For a help screen, describe the nav keys"""
-        return textwrap.dedent(Window.nav_keys)
+        return Window.nav_keys
 
     def _set_screen_dims(self):
         """Recalculate dimensions ... return True if geometry changed."""
         rows, cols = self.scr.getmaxyx()
         same = bool(rows == self.rows and cols == self.cols)
         self.rows, self.cols = rows, cols
+        if not same:
+            self._fit_pad(self.head)
+            self._fit_pad(self.body)
+            self.dirty, self.rewritten = self.DIRTY_ALL, True
+            self.hor_line_drawn = None
         return same
 
     @staticmethod
@@ -213,13 +291,18 @@ class Window:
         """ Curses initial setup.  Note: not using curses.wrapper because we
         don't wish to change the colors. """
         atexit.register(Window.stop_curses)
+        global HLINE, HLINE_REVERSE
         Window.static_scr = scr = curses.initscr()
+        HLINE = curses.ACS_HLINE
+        HLINE_REVERSE = HLINE | A_REVERSE
         curses.noecho()
         curses.cbreak()
         curses.curs_set(0)
+        # the cursor is hidden, so let refreshes leave it wherever rather
+        # than emit moves to park it (answer()'s input window still sets it)
+        scr.leaveok(True)
         scr.keypad(1)
-        scr.timeout(Window.timeout_ms)
-        scr.clear()
+        scr.nodelay(True) # prompt() waits in select() instead
         return scr
 
     def set_pick_mode(self, on=True, pick_size=1):
@@ -229,6 +312,9 @@ class Window:
         self.pick_size = max(pick_size, 1)
         if self.pick_mode and (not was_on or was_size != self.pick_size):
             self.last_pick_pos = -2 # indicates need to clear them all
+        if self.pick_mode != was_on or self.pick_size != was_size:
+            self.dirty, self.rewritten = self.DIRTY_ALL, True
+            self.hor_line_drawn = None
 
     @staticmethod
     def stop_curses():
@@ -240,6 +326,25 @@ class Window:
             curses.endwin()
             Window.static_scr = None
 
+    def _fit_pad(self, ns, row_cnt=0):
+        """Grow the pad of the head/body namespace (never beyond its
+        rows x cols limits) so it spans the screen and holds row_cnt rows.
+        The head is shown from its top and only as deep as its rows, so
+        its pad is sized to the rows added rather than to the screen."""
+        floor = self.rows if ns is self.body else 1
+        rows = min(ns.rows, max(ns.pad_rows, row_cnt, floor))
+        cols = min(ns.cols, max(ns.pad_cols, self.cols+1))
+        if rows > ns.pad_rows and ns.pad_rows:
+            rows = min(ns.rows, max(rows, 2*ns.pad_rows)) # amortize growth
+        if ns.pad is None:
+            ns.pad = curses.newpad(rows, cols)
+            ns.pad.leaveok(True) # (see _start_curses())
+            ns.shown = [False] * rows # sized w/ the pad (and a new pad is blank)
+        elif rows > ns.pad_rows or cols > ns.pad_cols:
+            ns.pad.resize(rows, cols)
+            ns.shown.extend([False] * (rows - len(ns.shown)))
+        ns.pad_rows, ns.pad_cols = rows, cols
+
     def calc(self):
         """Recalculate dimensions ... return True if geometry changed."""
         same = self._set_screen_dims()
@@ -249,20 +354,42 @@ class Window:
         self.body_base = self.head.view_cnt + self.hor_line_cnt
         return not same
 
-    def _add(self, ns, text, attr=None, resume=False):
-        """ Add text to head/body pad using its namespace"""
-        is_body = bool(id(ns) == id(self.body))
-        if ns.row_cnt < ns.rows:
-            row = max(ns.row_cnt - (1 if resume else 0), 0)
-            if (is_body and self.pick_mode) or attr is None:
-                attr = curses.A_NORMAL
+    def _add(self, ns, text, attr=None, resume=False, row=None):
+        """ Add text to head/body pad using its namespace (or, if given
+        a row, replace that row already added)"""
+        is_body = ns is self.body
+        self.dirty |= self.DIRTY_BODY if is_body else self.DIRTY_HEAD
+        appending = row is None
+        if not appending or ns.row_cnt < ns.rows:
+            if appending:
+                row = max(ns.row_cnt - (1 if resume else 0), 0)
+            if attr is None or (is_body and self.pick_mode):
+                attr = A_NORMAL
+            if row >= ns.pad_rows:
+                self._fit_pad(ns, row+1)
+            pad = ns.pad # bind once; called for every row of every frame
+            # clip to the pad so long lines cannot wrap onto the next row
+            text = text[:max(ns.pad_cols - 1 - (ns.end_x if resume else 0), 0)]
             if resume:
-                ns.pad.addstr(text, attr)
-                ns.texts[row] += text
+                pad.addstr(row, ns.end_x, text, attr)
+                ns.end_x = pad.getyx()[1]
+                self._forget(ns, row)
             else:
-                ns.pad.addstr(row, 0, text, attr)
-                ns.texts.append(text)  # text only history
-                ns.row_cnt += 1
+                width, shown = min(self.cols, ns.cols) - 1, ns.shown
+                was = shown[row]
+                if was and was[0] == text and was[1] == attr and was[2] == width:
+                    ns.end_x = was[3] # the pad row already holds just this
+                else:
+                    self.rewritten = True
+                    pad.addstr(row, 0, text, attr)
+                    ns.end_x = end_x = pad.getyx()[1]
+                    # blank the rest of the row ourselves so ncurses need not
+                    # emit clear-to-eol when it is shorter than the last frame
+                    if end_x < width:
+                        pad.addstr(' ' * (width - end_x))
+                    shown[row] = (text, attr, width, end_x)
+                if appending:
+                    ns.row_cnt += 1
 
     def add_header(self, text, attr=None, resume=False):
         """Add text to header"""
@@ -270,7 +397,18 @@ class Window:
 
     def add_body(self, text, attr=None, resume=False):
         """ Add text to body (below header and header line)"""
-        self._add(self.body, text, attr, resume)
+        body = self.body
+        if body.row_cnt < body.rows: # once full, callers may still blast rows
+            self._add(body, text, attr, resume)
+
+    def replace_row(self, y, text, attr=None, header=False):
+        """Rewrite a row already added (e.g., one w/ a ticking counter)
+        in place rather than clear() and re-add every row."""
+        ns = self.head if header else self.body
+        if 0 <= y < ns.row_cnt:
+            end_x = ns.end_x # of the last row (for resuming it)
+            self._add(ns, text, attr, row=y)
+            ns.end_x = end_x
 
     def draw(self, y, x, text, text_attr=None, width=None, leftpad=False, header=False):
         """Draws the given text (as utf-8 or unicode) at position (row=y,col=x)
@@ -278,34 +416,40 @@ class Window:
         This is more compatible with my older, simpler Window class.
         """
         ns = self.head if header else self.body
-        text_attr = text_attr if text_attr else curses.A_NORMAL
+        text_attr = text_attr if text_attr else A_NORMAL
         if y < 0 or y >= ns.rows or x < 0 or x >= ns.cols:
             return # nada if out of bounds
-        if y+1 >= ns.row_cnt:
+        self.dirty |= self.DIRTY_HEAD if header else self.DIRTY_BODY
+        if y >= ns.pad_rows:
+            self._fit_pad(ns, y+1)
+        if x >= ns.pad_cols - 1:
+            return # off screen
+        if y >= ns.row_cnt: # draw() blanks nothing, so clear what the
+            self._erase_unused(ns, y+1) # last frame left in the rows
             ns.row_cnt = y+1
+        self._forget(ns, y)
 
 
-        uni = text if isinstance(text, str) else text.decode('utf-8')
+        # str goes to curses as is (as _add() does); bytes are decoded once
+        uni = text if isinstance(text, str) else text.decode('utf-8', 'replace')
+        room = ns.pad_cols - 1 - x # no wrap onto the next row
 
         if width is not None:
-            width = min(width, self.cols - x)
+            width = min(width, self.cols - x, room)
             if width <= 0:
                 return
-            padlen = width - len(uni)
-            if padlen > 0:
-                if leftpad:
-                    uni = padlen * ' ' + uni
-                else:  # rightpad
-                    uni += padlen * ' '
-            text = uni[:width].encode('utf-8')
-        else:
-            text = uni.encode('utf-8')
+            # one padded copy (and a slice only if too long)
+            uni = uni.rjust(width) if leftpad else uni.ljust(width)
+            if len(uni) > width:
+                uni = uni[:width]
+        elif len(uni) > room:
+            uni = uni[:room]
 
         try:
-            while y >= len(ns.texts):
-                ns.texts.append('')
-            ns.texts[y] = ns.texts[y][:x].ljust(x) + uni + ns.texts[y][x+len(uni):]
-            ns.pad.addstr(y, x, text, text_attr)
+            try:
+                ns.pad.addstr(y, x, uni, text_attr)
+            except UnicodeEncodeError: # the pad's encoding (locale) lacks some
+                ns.pad.addstr(y, x, uni.encode('utf-8'), text_attr)
         except curses.error:
             # this sucks, but curses returns an error if drawing the last character
             # on the screen always.  this can happen if resizing screen even if
@@ -318,20 +462,33 @@ class Window:
         if not self.pick_mode:
             return
         pos0, pos1 = self.last_pick_pos, self.pick_pos
+        # chgat() flips only the attributes (of whole rows); the pad
+        # itself holds the characters so no copy of the text is kept
+        # (the rows so flipped are forgotten, as their attrs are not _add()'s)
+        pad, body = self.body.pad, self.body
         if pos0 == -2: # special flag to clear all formatting
-            for row in range(self.body.row_cnt):
-                self.body.pad.addstr(row, 0, self.body.texts[row], curses.A_NORMAL)
+            # rows _add() last wrote w/ A_NORMAL are already plain (and
+            # keep their shown entry); flip only those that may not be
+            shown = body.shown
+            for row in range(min(body.row_cnt, len(shown))):
+                was = shown[row]
+                if not was or was[1] != A_NORMAL:
+                    pad.chgat(row, 0, -1, A_NORMAL)
+                    self._forget(body, row)
         if pos0 != pos1:
             if 0 <= pos0 < self.body.row_cnt:
-                for i in range(self.pick_size):
-                    self.body.pad.addstr(pos0+i, 0, self.body.texts[pos0+i], curses.A_NORMAL)
+                for row in range(pos0, pos0+self.pick_size):
+                    pad.chgat(row, 0, -1, A_NORMAL)
+                    self.dirty_rows.add(row)
+                    self._forget(body, row)
             if 0 <= pos1 < self.body.row_cnt:
-                for i in range(self.pick_size):
-                    string = self.body.texts[pos1+i]
-                    self.body.pad.addstr(pos1+i, 0, string, curses.A_REVERSE)
+                for row in range(pos1, pos1+self.pick_size):
+                    pad.chgat(row, 0, -1, A_REVERSE)
+                    self.dirty_rows.add(row)
+                    self._forget(body, row)
                 self.last_pick_pos = pos1
 
-    def _scroll_indicator_row(self):
+    def _scroll_indicator_row(self, scroll_pos=None):
         """ Compute the absolute scroll indicator row:
         - We want the top to be only when scroll_pos==0
         - We want the bottom to be only when scroll_pos=max_scroll_pos-1
@@ -340,9 +497,9 @@ class Window:
             return self.body_base
         y2, y1 = self.scroll_view_size-1, 1
         x2, x1 = self.max_scroll_pos, 1
-        x = self.scroll_pos
-        pos = y1 + (y2-y1)*(x-x1)/(x2-x1)
-        return min(self.body_base + int(max(pos, 0)), self.rows-1)
+        x = self.scroll_pos if scroll_pos is None else scroll_pos
+        pos = y1 + (y2-y1)*(x-x1)//(x2-x1) # int math; floors like int()
+        return min(self.body_base + max(pos, 0), self.rows-1)
 
     def _scroll_indicator_col(self):
         """ Compute the absolute scroll indicator col:
@@ -364,18 +521,36 @@ class Window:
             return ind0
         if pos >= pos9:
             return ind9
-        ind = int(round(ind0 + (ind9-ind0+1)*(pos-pos0)/(pos9-pos0+1)))
+        num, den = (ind9-ind0+1)*(pos-pos0), pos9-pos0+1
+        ind = ind0 + (2*num + den)//(2*den) # rounded w/o floats
         return min(max(ind, ind0+1), ind9-1)
 
     def render(self):
         """Draw everything added. In a loop cuz curses is a
         piece of shit."""
-        for _ in range(128):
+        if not self.dirty and self._set_screen_dims():
+            return # nothing changed and no resize
+        if (not self.rewritten and self._set_screen_dims()
+                and self.last_row_cnts == (self.head.row_cnt, self.body.row_cnt)
+                and self.scroll_pos == self.last_scroll_pos
+                and (not self.pick_mode or self.pick_pos == self.last_pick_pos)):
+            # re-added, but the same as the frame on the screen; the other
+            # bits stay set as clear()'s erase of the screen is not yet drawn
+            self.dirty &= ~self.DIRTY_SCROLL
+            return
+        # a curses error is most likely a resize in flight; re-query the
+        # size and retry w/o delay, then back off (~0.6s at most in all)
+        delay = 0
+        for _ in range(8):
             try:
                 self.render_once()
                 return
             except curses.error:
-                time.sleep(0.16)
+                if delay:
+                    time.sleep(delay)
+                delay = delay*2 if delay else 0.005
+                self.last_resize_check = 0.0 # so the poll is not throttled
+                self._resize_poll()
                 self._set_screen_dims()
                 continue
         try:
@@ -399,17 +574,58 @@ class Window:
             raise
 
 
+    def _draw_hor_line(self):
+        """Draw the line below the header w/ its scroll indicator."""
+        if self.head.view_cnt < self.rows:
+            ind_pos, bot, cnt = self._scroll_indicator_col(), 0, 0
+            if ind_pos >= 0:
+                bot, cnt = ind_pos, 1
+                if 0 < ind_pos < self.cols-1:
+                    # half the width of the view relative to the body (rounded)
+                    half = ((self.scroll_view_size*self.cols + self.body.row_cnt)
+                            // (2*self.body.row_cnt))
+                    bot = max(ind_pos-half, 1)
+                    top = min(ind_pos+half, self.cols-1)
+                    cnt = top - bot
+            drawn = (self.head.view_cnt, self.cols, bot, cnt)
+            if drawn == self.hor_line_drawn:
+                return # the screen already has just this line
+            self.scr.hline(self.head.view_cnt, 0, HLINE, self.cols)
+            if cnt > 0: # one run of reversed line chars, not an addch() per column
+                self.scr.hline(self.head.view_cnt, bot, HLINE_REVERSE, cnt)
+            self.hor_line_drawn = drawn
+
+    def scroll_only(self):
+        """Fast path for a pure scroll (no new content and not in pick mode):
+        redraw only the scroll indicator and the body pad viewport."""
+        if (self.pick_mode or self.body_base >= self.rows
+                or self.dirty & ~self.DIRTY_SCROLL):
+            self.render()
+            return
+        try:
+            pos, hi = self.scroll_pos, self.max_scroll_pos
+            pos = hi if pos > hi else (pos if pos > 0 else 0)
+            self.scroll_pos = pos
+            self.pick_pos = pos + self._scroll_indicator_row(pos) - self.body_base
+            self._draw_hor_line()
+            self.scr.noutrefresh()
+            self.body.pad.noutrefresh(self.scroll_pos, 0,
+                  self.body_base, 0, self.rows-1, self.cols-1)
+            curses.doupdate()
+            self.dirty, self.drawn_mono = 0, time.monotonic()
+        except curses.error:
+            self.render()
+
     def render_once(self):
         """Draw everything added."""
         self.calc()
-        # if self.scroll_view_size <= 0:
-            # self.scr.refresh()
+        if self.rows <= 0 or self.cols <= 0:
+            return # nothing is visible (e.g., minimized)
         indent = 0
         if self.body_base < self.rows:
-            ind_pos = 0 if self.pick_mode else self._scroll_indicator_row()
             if self.pick_mode:
-                self.pick_pos = max(self.pick_pos, 0)
-                self.pick_pos = min(self.pick_pos, self.body.row_cnt-1)
+                pos, hi = self.pick_pos, self.body.row_cnt-1
+                self.pick_pos = hi if pos > hi else (pos if pos > 0 else 0)
                 if self.pick_pos >= 0:
                     self.pick_pos -= (self.pick_pos % self.pick_size)
                 if self.pick_pos < 0:
@@ -420,49 +636,80 @@ class Window:
                 elif self.scroll_pos < self.pick_pos - (self.scroll_view_size - self.pick_size):
                     # light position is above body top
                     self.scroll_pos = self.pick_pos - (self.scroll_view_size - self.pick_size)
-                self.scroll_pos = max(self.scroll_pos, 0)
-                self.scroll_pos = min(self.scroll_pos, self.max_scroll_pos)
+                pos, hi = self.scroll_pos, self.max_scroll_pos
+                self.scroll_pos = hi if pos > hi else (pos if pos > 0 else 0)
                 indent = 1
-            else:
-                self.scroll_pos = max(self.scroll_pos, 0)
-                self.scroll_pos = min(self.scroll_pos, self.max_scroll_pos)
-                self.pick_pos = self.scroll_pos + ind_pos - self.body_base
+            else: # clamp first so the indicator reflects the final position
+                pos, hi = self.scroll_pos, self.max_scroll_pos
+                pos = hi if pos > hi else (pos if pos > 0 else 0)
+                self.scroll_pos = pos
+                self.pick_pos = pos + self._scroll_indicator_row(pos) - self.body_base
                 # indent = 1 if self.body.row_cnt > self.scroll_view_size else 0
 
         if indent > 0 and self.pick_mode:
             self.scr.vline(self.body_base, 0, ' ', self.scroll_view_size)
             if self.pick_pos >= 0:
                 pos = self.pick_pos - self.scroll_pos + self.body_base
-                self.scr.addstr(pos, 0, '>', curses.A_REVERSE)
+                self.scr.addstr(pos, 0, '>', A_REVERSE)
 
-        if self.head.view_cnt < self.rows:
-            self.scr.hline(self.head.view_cnt, 0, curses.ACS_HLINE, self.cols)
-            ind_pos = self._scroll_indicator_col()
-            if ind_pos >= 0:
-                bot, cnt = ind_pos, 1
-                if 0 < ind_pos < self.cols-1:
-                    width = self.scroll_view_size/self.body.row_cnt * self.cols
-                    bot = max(int(round(ind_pos-width/2)), 1)
-                    top = min(int(round(ind_pos+width/2)), self.cols-1)
-                    cnt = top - bot
-                # self.scr.addstr(self.head.view_cnt, bot, '-'*cnt, curses.A_REVERSE)
-                # self.scr.hline(self.head.view_cnt, bot, curses.ACS_HLINE, curses.A_REVERSE, cnt)
-                for idx in range(bot, bot+cnt):
-                    self.scr.addch(self.head.view_cnt, idx, curses.ACS_HLINE, curses.A_REVERSE)
+        self._draw_hor_line()
 
-        self.scr.refresh()
+        # stage all surfaces, then write the terminal once
+        self.scr.noutrefresh()
+        for ns in (self.head, self.body):
+            self._erase_unused(ns)
 
-        if self.rows > 0:
+        if self.dirty & self.DIRTY_HEAD:
             last_row = min(self.head.view_cnt, self.rows)-1
             if last_row >= 0:
-                self.head.pad.refresh(0, 0, 0, indent, last_row, self.cols-1)
+                self.head.pad.noutrefresh(0, 0, 0, indent, last_row, self.cols-1)
 
         if self.body_base < self.rows:
             if self.pick_mode:
                 self.highlight_picked()
-            self.body.pad.refresh(self.scroll_pos, 0,
-                  self.body_base, indent, self.rows-1, self.cols-1)
+            if (self.dirty & (self.DIRTY_HEAD|self.DIRTY_BODY)
+                    or self.scroll_pos != self.last_scroll_pos):
+                self.body.pad.noutrefresh(self.scroll_pos, 0,
+                      self.body_base, indent, self.rows-1, self.cols-1)
+            else: # only the re-highlighted rows within the view
+                top, bot = self.scroll_pos, self.scroll_pos + self.scroll_view_size - 1
+                damage = [row for row in self.dirty_rows if top <= row <= bot]
+                if damage:
+                    lo, hi = min(damage), max(damage)
+                    self.body.pad.noutrefresh(lo, 0, self.body_base + lo - top,
+                          indent, self.body_base + hi - top, self.cols-1)
+        curses.doupdate()
+        self.dirty, self.last_scroll_pos = 0, self.scroll_pos
+        self.drawn_mono = time.monotonic()
+        self.rewritten, self.last_row_cnts = False, (self.head.row_cnt, self.body.row_cnt)
+        self.dirty_rows.clear()
+
+
+    def _forget(self, ns, row):
+        """Note that a pad row was written other than by _add()."""
+        self.rewritten = True
+        if row < len(ns.shown): # (else it is past the pad; nothing to forget)
+            ns.shown[row] = None
 
+    @staticmethod
+    def _erase_unused(ns, end=None):
+        """Blank the pad rows (past those added, up to end) left from
+        the last frame."""
+        shown, pad = ns.shown, ns.pad
+        end = len(shown) if end is None else min(end, len(shown))
+        for row in range(ns.row_cnt, min(end, ns.pad_rows)):
+            if shown[row] is not False: # False: already blank
+                pad.move(row, 0)
+                pad.clrtoeol()
+                shown[row] = False
+
+    def _touch_all(self):
+        """Mark everything as needing a redraw (e.g., after a popup) even
+        if no content is re-added."""
+        self.head.pad.touchwin()
+        self.body.pad.touchwin()
+        self.dirty, self.rewritten = self.DIRTY_ALL, True
+        self.hor_line_drawn = None
 
     def answer(self, prompt='Type string [then Enter]', seed='', width=80):
         """Popup"""
@@ -481,14 +728,17 @@ class Window:
         col0 = (self.cols - (width+2)) // 2
         col9 = col0 + width + 2 - 1
 
-        self.scr.clear()
+        self.scr.erase()
+        self._touch_all() # popup overwrites the screen
         win = curses.newwin(1, width, row0+1, col0+1) # input window
         rectangle(self.scr, row0, col0, row9, col9)
         self.scr.addstr(row0, col0+1, prompt[0:width])
         win.addstr(seed[0:width-1])
         ending = 'Press ENTER to submit'[:width]
         self.scr.addstr(row9, col0+1+width-len(ending), ending)
-        self.scr.refresh()
+        self.scr.noutrefresh()
+        win.noutrefresh() # (else getch() in edit() refreshes it on its own)
+        curses.doupdate()
         curses.curs_set(2)
         answer = Textbox(win).edit(mod_key).strip()
         curses.curs_set(0)
@@ -513,9 +763,12 @@ class Window:
         col0 = (self.cols - (width+2)) // 2
         col9 = col0 + width + 2 - 1
 
-        self.scr.clear()
-        for row in range(self.rows):
-            self.scr.insstr(row, 0, ' '*self.cols, curses.A_REVERSE)
+        # erase() fills w/ the background, so a reversed one paints the
+        # whole screen in one call; then back to normal for what is drawn
+        self.scr.bkgdset(' ', A_REVERSE)
+        self.scr.erase()
+        self.scr.bkgdset(' ', A_NORMAL)
+        self._touch_all() # popup overwrites the screen
         pad = curses.newpad(20, 200)
         win = curses.newwin(1, 1, row9-1, col9-2) # input window
         rectangle(self.scr, row0, col0, row9, col9)
@@ -523,64 +776,123 @@ class Window:
         pad.addstr(message)
         ending = 'Press ENTER to ack'[:width]
         self.scr.addstr(row9, col0+1+width-len(ending), ending)
-        self.scr.refresh()
-        pad.refresh(0, 0, row0+1, col0+1, row9-1, col9-1)
+        self.scr.noutrefresh()
+        pad.noutrefresh(0, 0, row0+1, col0+1, row9-1, col9-1)
+        curses.doupdate()
         Textbox(win).edit(mod_key).strip()
         return
 
     def clear(self):
         """Clear in prep for new screen"""
-        self.scr.clear()
-        self.head.pad.clear()
-        self.body.pad.clear()
-        self.head.texts, self.body.texts, self.last_pick_pos = [], [], -1
+        # erase() (not clear()) so ncurses repaints only what differs
+        self.scr.erase()
+        self.hor_line_drawn = None
+        for ns in (self.head, self.body):
+            # the content is discarded anyhow, so this is when to give back
+            # a pad left far oversized (by a shrunken screen or body)
+            need = max(self.rows, ns.row_cnt)
+            if ns.pad_rows > 2*need or ns.pad_cols > 2*(self.cols+1):
+                ns.pad, ns.pad_rows, ns.pad_cols = None, 0, 0
+                self._fit_pad(ns, need)
+                self.rewritten = True
+            else: # keep the rows _add() wrote so it can skip rewriting the
+                # unchanged; render blanks those not re-added
+                pad, shown = ns.pad, ns.shown
+                for row, was in enumerate(shown):
+                    if was is None: # unknown (e.g., by draw()), so erase it
+                        self.rewritten = True
+                        pad.move(row, 0)
+                        pad.clrtoeol()
+                        shown[row] = False
+        self.last_pick_pos = -1
+        self.dirty_rows.clear()
         self.head.row_cnt = self.body.row_cnt = 0
+        self.dirty = self.DIRTY_ALL
+
+    def _resize_poll(self):
+        """Whether the tty size differs from ours, checked at most every
+        0.1s; if so, curses is resized to match. Needed since a nodelay
+        getch() does not report a SIGWINCH as KEY_RESIZE."""
+        now = time.monotonic()
+        if now - self.last_resize_check < 0.1:
+            return False
+        self.last_resize_check = now
+        try:
+            cols, rows = os.get_terminal_size()
+        except OSError:
+            return False
+        if rows == self.rows and cols == self.cols:
+            return False
+        curses.resize_term(rows, cols) # (unlike resizeterm, queues no KEY_RESIZE)
+        self.scr.clearok(True) # what the tty now shows is unknown
+        return True
 
     def prompt(self, seconds=1.0):
         """Here is where we sleep waiting for commands or timeout"""
-        ctl_b, ctl_d, ctl_f, ctl_u = 2, 4, 6, 21
-        elapsed = 0.0
-        while elapsed < seconds:
-            key = self.scr.getch()
-            if key == curses.ERR:
-                elapsed += self.timeout_ms / 1000
-                continue
-            if key in (curses.KEY_RESIZE, ) or curses.is_term_resized(self.rows, self.cols):
+        ERR, KEY_RESIZE = curses.ERR, curses.KEY_RESIZE
+        getch, handled_keys = self.scr.getch, self.handled_keys
+        moves = self.nav_moves
+        delta = self.pick_size if self.pick_mode else 1
+        view = self.scroll_view_size
+        deadline = time.monotonic() + seconds
+        # nav keys only move the position; the moves are drawn once the
+        # pending keys are drained (so key repeat/pastes render once)
+        while True:
+            key = getch() # never blocks; drains what curses has buffered
+            if key == ERR:
+                if self.dirty & self.DIRTY_SCROLL:
+                    # if the last frame is very recent, wait out the rest
+                    # of its time (gathering any keys that come meanwhile)
+                    early = self.drawn_mono + self.frame_secs - time.monotonic()
+                    if early > 0:
+                        select.select([sys.stdin], [], [], early)
+                        continue
+                    self.scroll_only() # (full render if in pick mode)
+                remains = deadline - time.monotonic()
+                if remains <= 0:
+                    break
+                select.select([sys.stdin], [], [], min(remains, self.timeout_ms / 1000))
+                if not self._resize_poll():
+                    continue
+                key = KEY_RESIZE
+            if key == KEY_RESIZE or self._resize_poll():
+                # a drag can queue a burst of KEY_RESIZE; eat them so the
+                # caller renders once at the final size
+                key = getch()
+                while key == KEY_RESIZE:
+                    key = getch()
+                if key != ERR:
+                    curses.ungetch(key) # keep a real keystroke for later
                 # self.scr.erase()
                 self._set_screen_dims()
                 # self.render()
                 break
 
             # App keys...
-            if key in self.handled_keys:
+            if key in handled_keys:
+                if self.dirty & self.DIRTY_SCROLL:
+                    self.scroll_only()
                 return key # return for handling
 
             # Navigation Keys...
+            move = moves.get(key, None)
+            if move is None:
+                continue # ignore unhandled keys
+            rows, pages, jump = move
             pos = self.pick_pos if self.pick_mode else self.scroll_pos
-            delta = self.pick_size if self.pick_mode else 1
             was_pos = pos
-            if key in (ord('k'), curses.KEY_UP):
-                pos -= delta
-            elif key in (ord('j'), curses.KEY_DOWN):
-                pos += delta
-            elif key in (ctl_b, curses.KEY_PPAGE):
-                pos -= self.scroll_view_size
-            elif key in (ctl_u, ):
-                pos -= self.scroll_view_size//2
-            elif key in (ctl_f, curses.KEY_NPAGE):
-                pos += self.scroll_view_size
-            elif key in (ctl_d, ):
-                pos += self.scroll_view_size//2
-            elif key in (ord('0'), curses.KEY_HOME):
-                pos = 0
-            elif key in (ord('$'), curses.KEY_END):
-                pos = self.body.row_cnt - 1
-            elif key in (ord('H'), ):
-                pos = self.scroll_pos
-            elif key in (ord('M'), ):
-                pos = self.scroll_pos + self.scroll_view_size//2
-            elif key in (ord('L'), ):
-                pos = self.scroll_pos + self.scroll_view_size-1
+            if rows is not None:
+                pos += rows * delta
+            elif pages is not None:
+                pos += int(pages * view)
+            else:
+                if self.dirty & self.DIRTY_SCROLL:
+                    self.scroll_only() # jumps are relative to the view
+                pos = jump(self, view)
+            # clamp now since nothing is rendered between coalesced moves
+            hi = self.body.row_cnt-1 if self.pick_mode else self.max_scroll_pos
+            pos = hi if pos > hi else pos
+            pos = pos if pos > 0 else 0
 
             if self.pick_mode:
                 self.pick_pos = pos
@@ -589,8 +901,7 @@ class Window:
                 self.pick_pos = pos
 
             if pos != was_pos:
-                self.render()
-            # ignore unhandled keys
+                self.dirty |= self.DIRTY_SCROLL
         return None
 
 def no_runner():
@@ -618,22 +929,30 @@ if __name__ == '__main__':
 
         win = Window(head_line=True, keys=spin.keys)
         opts.name = "[hit 'n' to enter name]"
+        key, built_for = None, None
         for loop in range(100000000000):
             body_size = int(round(win.scroll_view_size*opts.mult))
-            if opts.help_mode:
-                win.set_pick_mode(False)
-                spin.show_help_nav_keys(win)
-                spin.show_help_body(win)
+            shape = (body_size, win.rows, win.cols) # (prompt() notes resizes)
+            if key is None and shape == built_for and not opts.help_mode:
+                # only the header ticks; the body stays as built
+                win.replace_row(0, f'Header: {loop} "{opts.name}"', header=True)
             else:
-                win.set_pick_mode(opts.pick_mode, opts.pick_size)
-                win.add_header(f'Header: {loop} "{opts.name}"')
-                for idx, line in enumerate(range(body_size//opts.pick_size)):
-                    win.add_body(f'Main pick: {loop}.{line}')
-                    for num in range(1, opts.pick_size):
-                        win.draw(num+idx*opts.pick_size, 0, f'  addon: {loop}.{line}')
+                win.clear()
+                built_for = shape
+                if opts.help_mode:
+                    win.set_pick_mode(False)
+                    spin.show_help_nav_keys(win)
+                    spin.show_help_body(win)
+                else:
+                    win.set_pick_mode(opts.pick_mode, opts.pick_size)
+                    win.add_header(f'Header: {loop} "{opts.name}"')
+                    for idx, line in enumerate(range(body_size//opts.pick_size)):
+                        win.add_body(f'Main pick: {loop}.{line}')
+                        for num in range(1, opts.pick_size):
+                            win.draw(num+idx*opts.pick_size, 0, f'  addon: {loop}.{line}')
             win.render()
-            do_key(win.prompt(seconds=5))
-            win.clear()
+            key = win.prompt(seconds=5)
+            do_key(key)
 
     try:
         main()
@@ -46,13 +46,20 @@ import sys
 import traceback
 import time
 import curses
+import functools
+import threading
+import heapq
+import resource
+from concurrent.futures import ThreadPoolExecutor
+from array import array
 # from curses.textpad import rectangle
 from types import SimpleNamespace
 from io import StringIO
 from datetime import datetime, timedelta
 from pmemstat.Window import Window, OptionSpinner
 from pmemstat.KillThem import KillThem
-from pmemstat.CpuSmooth import CpuSmooth, SysStat
+from pmemstat.CpuSmooth import (CpuSmooth, SysStat, INTERPRETERS, NONWORD_BYTES,
+                                list_pid_dirs)
 
 # Trace Levels:
 #  0 - forced, temporary debugging (comment it out)
@@ -86,13 +93,37 @@ def human(number):
     """ Return a concise number description."""
     if number <= 0:
         return 0
-    suffixes = ['K', 'M', 'G', 'T']
-    while suffixes:
-        suffix = suffixes.pop(0)
-        number /= 1024
-        if number < 999.95 or not suffixes:
-            return f'{number:.1f}{suffix}'
-    return '' # impossible, but make pylint happy
+    # pick the suffix straight from the magnitude: 1024**idx <= number < 1024**(idx+1)
+    idx = min(max((int(number).bit_length() - 1) // 10, 1), 4)
+    if idx < 4 and number >= 999.95 * (1 << (10*idx)):
+        idx += 1 # would print as 1024.0 otherwise
+    return f'{number / (1 << (10*idx)):.1f}{" KMGT"[idx]}'
+
+##############################################################################
+##   parse_cmdline()
+##############################################################################
+@functools.lru_cache(maxsize=4096)
+def parse_cmdline(raw):
+    """ Map the raw bytes of /proc/<pid>/cmdline to (basename, cmdline);
+    (None, None) means a kernel thread. Memoized since respawning
+    children commonly share the same command line. Works on bytes and
+    decodes only the results."""
+    if raw.endswith(b'\0'):
+        raw = raw[:-1]
+    arguments = raw.split(b'\0')
+    if not arguments[0]: # kernel process
+        return None, None
+    # sometimes the first word
+    wds = os.path.basename(arguments[0]).split() + arguments[1:]
+    basename = wds.pop(0).strip(NONWORD_BYTES).decode('utf-8', 'replace')
+    if basename in INTERPRETERS and wds:
+        script = os.path.basename(wds[0])
+        if script != wds[0]:
+            basename = f'{basename}->{script.decode("utf-8", "replace")}'
+            del wds[0]
+    if not wds:
+        return basename, basename
+    return basename, basename + ' ' + b' '.join(wds).decode('utf-8', 'replace')
 
 ####################################################################################
 ###### ZramProjector class
@@ -135,20 +166,16 @@ class ZramProjector:
             pathname = f'/sys/class/block/{device}/mm_stat'
             if not os.path.exists(pathname):
                 continue # not active
-            with open(pathname, encoding='utf-8') as fh:
+            with open(pathname, 'rb') as fh:
                 ns = SimpleNamespace()
-                for line in fh: # all the goodies are on 1st line
-                    nums = line.split()
-                    for idx, field in enumerate(fields):
-                        setattr(ns, field, int(nums[idx]))
-                    break
+                nums = fh.readline().split() # all the goodies are on 1st line
+                for idx, field in enumerate(fields):
+                    setattr(ns, field, int(nums[idx]))
                 infos[device] = ns
             for param in ('disksize', ):
                 pathname = f'/sys/class/block/{device}/{param}'
-                with open(pathname, encoding='utf-8') as fh:
-                    for line in fh: # one value, one line
-                        setattr(ns, param, int(line.strip()))
-                        break
+                with open(pathname, 'rb') as fh: # one value, one line
+                    setattr(ns, param, int(fh.readline()))
             if self.DB: print(f'DB: {device}: {ns}')
 
         self.devs = infos
@@ -211,6 +238,62 @@ class ZramProjector:
         self.e_avail = e_max_used - e_used
 
 
+####################################################################################
+###### ChunkTable class
+####################################################################################
+class ChunkTable:
+    """The sections of one smaps file as parallel columns (one row per mapping)
+    rather than one record per mapping; appending a row costs no allocation
+    beyond the occasional column growth."""
+    cat_names = ('', 'shSYSV', 'shOth', 'stack', 'data', 'text') # 0 is "not yet"
+    SHARED, WRITE, NONE = 1, 2, 4 # bits of perms_flags: 's', 'w', '---'
+    NAMED, SYSV, STACK = 8, 16, 32 # ... and of the item: any, 'SYSV', '[stack]'
+    perms_table = {} # raw perms (e.g., b'r-xp') => (perms, perms_flags); few exist
+    __slots__ = ('beg', 'end', 'offset', 'size', 'rss', 'pss', 'shared',
+                 'private', 'swap', 'esize', 'cat', 'perms_flags', 'perms', 'item')
+
+    def __init__(self):
+        self.beg, self.end, self.offset = array('Q'), array('Q'), array('Q')
+        self.size, self.rss, self.pss = array('q'), array('q'), array('q')
+        self.shared, self.private, self.swap = array('q'), array('q'), array('q')
+        self.esize = array('q')
+        self.cat = bytearray() # index into cat_names
+        self.perms_flags = bytearray()
+        self.perms, self.item = [], []
+
+    def __len__(self):
+        return len(self.beg)
+
+    def add_row(self, beg, end, raw_perms, offset, item):
+        """Append a section; its items are then filled in at index -1"""
+        self.beg.append(beg)
+        self.end.append(end)
+        self.offset.append(offset)
+        for col in (self.size, self.rss, self.pss, self.shared,
+                    self.private, self.swap, self.esize):
+            col.append(0)
+        self.cat.append(0)
+        entry = self.perms_table.get(raw_perms)
+        if entry is None: # decoded and tested once per distinct perms
+            perms = raw_perms.decode()
+            entry = ChunkTable.perms_table[raw_perms] = (perms,
+                    (self.SHARED if 's' in perms else 0)
+                    | (self.WRITE if 'w' in perms else 0)
+                    | (self.NONE if perms.startswith('---') else 0))
+        perms, flags = entry
+        if item:
+            flags |= (self.NAMED | (self.SYSV if 'SYSV' in item else 0)
+                      | (self.STACK if '[stack]' in item else 0))
+        self.perms_flags.append(flags)
+        self.perms.append(perms)
+        self.item.append(item)
+
+    def row_str(self, idx):
+        """One row for debugging"""
+        return (f'{self.cat_names[self.cat[idx]]} eSize={self.esize[idx]}'
+            + f' size={self.size[idx]} {self.perms[idx]} {self.item[idx]}')
+
+
 ####################################################################################
 ###### ProcMem class
 ####################################################################################
@@ -220,22 +303,50 @@ class ProcMem:
       - the ProcMem static data represents aggregate data for groups.
     """
     # pylint: disable=too-many-instance-attributes
-    section_pat = re.compile(
-            r'^([0-9a-f]+)-([0-9a-f]+)' # $1,$2: 00400000-004b8000
-            + r'\s+([a-z-]+)'   # $3: r-xp
-            + r'\s+([0-9a-f]+)'  # $4: 00000000
-            + r'\s+(\S+)'  # $5: fd:00
-            + r'\s+(\d+)'  # $6: 11143998
-            + r'(\s*|\s+(\S.*))$' # $8: /.../inetrep
-            , re.IGNORECASE)
-    item_pat = re.compile(
-            r'^(\w+):' # $1: MMUPageSize:
-            + r'\s+(\d+)'  # $2: 4
-            + r'\s+kb$'  # kB
-            , re.IGNORECASE)
-    junk_pat = re.compile(
-            r'^(THPeligible|VmFlags|ProtectionKey)'
-            , re.IGNORECASE)
+    __slots__ = ('pid', 'inode', 'alive', 'is_new', 'wanted', 'kernel', 'is_changed',
+                 'why_not', 'smaps_file', 'rollup_file', 'cpu', 'rollup_kb',
+                 'smaps_summary', 'smaps_rollup_kb', 'exebasename', 'key',
+                 'cmdline', 'cmdline_trunc', 'rollup_fd')
+    smaps_pat = re.compile( # one pass over the whole smaps file
+            rb'^(?:([0-9a-f]+)-([0-9a-f]+)' # $1,$2: 00400000-004b8000
+            + rb' +([a-z-]+)'   # $3: r-xp
+            + rb' +([0-9a-f]+)'  # $4: 00000000
+            + rb' +\S+'  # fd:00
+            + rb' +\d+'  # 11143998
+            + rb'[ \t]*([^\n]*)' # $5: /.../inetrep
+            + rb'|(Size|Rss|Pss|Swap' # $6: Rss:
+            + rb'|(?:Shared|Private)_(?:Clean|Dirty|Hugetlb)):'
+            + rb' +(\d+) kB)$'  # $7: 4
+            , re.MULTILINE)
+    summed_fields = ( # the numeric fields of a summary (in display order)
+            'cpu_pct',
+            'pswap',
+            'shSYSV',
+            'shOth', # e.g., memory mapped file
+            'stack',
+            'text',
+            'data', # deprecated 'pseudo' (e.g., memory barrier) now in 'data'
+            'ptotal',
+            'pss',  # comes from rollups
+            )
+    rollup_tags = { # smaps_rollup tag => summary field
+            b'Pss_Anon': 'data',
+            b'Pss_File': 'text',
+            b'Pss_Shmem': 'shOth',
+            b'SwapPss': 'pswap',
+            }
+    smaps_tags = { # smaps tag => (ChunkTable column, whether to accumulate)
+            b'Size': ('size', False),
+            b'Rss': ('rss', False),
+            b'Pss': ('pss', False),
+            b'Swap': ('swap', False),
+            b'Shared_Clean': ('shared', True),
+            b'Shared_Dirty': ('shared', True),
+            b'Shared_Hugetlb': ('shared', True),
+            b'Private_Clean': ('private', True),
+            b'Private_Dirty': ('private', True),
+            b'Private_Hugetlb': ('private', True),
+            }
     opts = None
     # debug = 0
     # summaries = {} # indexed by pid TODO remove this (replace by groups)
@@ -246,27 +357,13 @@ class ProcMem:
     # fwidth = 11
     pmemstat = None # the main program object
     max_cmd_len = 32 # command line maximum length
-    chunk_dict = {
-            'cat': None,
-            'beg': 0,
-            'end': 0,
-            'offset': 0,
-            'size': 0,
-            'eSize': 0,
-            'rss': 0,
-            'pss': 0,
-            'shared': 0,
-            'private': 0,
-            'swap': 0,
-            'pswap': 0,
-            'perms': '',
-            'item': '',
-            }
-    clock_tick = None
     parse_err_cnt = 0
+    tls = threading.local() # .read_buf is reused for every /proc read of a thread
+    kept_fds, max_kept_fds = 0, 0 # rollup fds held open (and the cap on them)
 
     def __init__(self, pid):
         self.pid = pid
+        self.inode = 0 # of /proc/<pid>; it changes if the PID is recycled
         self.alive = True
         self.is_new = True
         self.wanted = True # until proven otherwise
@@ -275,15 +372,34 @@ class ProcMem:
         self.why_not = None # populate me with why unwanted
         self.smaps_file = f'/proc/{self.pid}/smaps'
         self.rollup_file = f'/proc/{self.pid}/smaps_rollup'
+        self.rollup_fd = None # kept open across loops (if under max_kept_fds)
         self.cpu = None
+        self.rollup_kb = 0 # latest rollup pss+swap
+        self.smaps_summary, self.smaps_rollup_kb = None, 0 # last smaps and its rollup_kb
         self.exebasename = None, None
         self.key, self.cmdline, self.cmdline_trunc = None, None, None
 
-    def refresh_cpu(self):
-        """Get the Cpu Number for the PID (if possible)"""
+    def close(self):
+        """Release the fds kept for the PID; call when it is gone."""
+        if self.rollup_fd is not None:
+            try:
+                os.close(self.rollup_fd)
+            except Exception:
+                pass
+            self.rollup_fd = None
+            ProcMem.kept_fds -= 1
+        if self.cpu:
+            self.cpu.close()
+
+    def get_cpu(self):
+        """Get the CpuSmooth of the PID (created on first use)"""
         if not self.cpu:
             self.cpu = CpuSmooth(self.pid, avg_secs= ProcMem.opts.cpu_avg_secs)
-        return self.cpu.refresh_cpu() # sets self.cpu.percent
+        return self.cpu
+
+    def refresh_cpu(self, mono_ns=None):
+        """Get the Cpu Number for the PID (if possible)"""
+        return self.get_cpu().refresh_cpu(mono_ns=mono_ns) # sets self.cpu.percent
 
     def get_cmdline(self):
         """Get the command line of the PID."""
@@ -291,34 +407,21 @@ class ProcMem:
 
             cmdline_file = f'/proc/{self.pid}/cmdline'
             try:
-                # pylint: disable=consider-using-with
-                line = open(cmdline_file, encoding='utf-8').read()[:-1]
+                with open(cmdline_file, 'rb') as fhandle:
+                    raw = fhandle.read()
             except FileNotFoundError as exc:
                 # this seems to be a race which ignore; either the process is just
                 # started or just quickly ended before even identified
                 if DebugLevel:
                     DB(1, f'skip pid={self.pid} no-rollup-lines exc={type(exc).__name__}')
                 return
-            arguments = line.split('\0')
-            if not arguments or not arguments[0]: # kernel process
+            basename, cmdline = parse_cmdline(raw)
+            if basename is None: # kernel process
                 self.wanted, self.kernel = False, True
                 # print(f'{self.pid}: kernel thread')
                 return
-            # DB(0, f'{self.pid}: {arguments}')
-            # sometimes the first word
-            wds = os.path.basename(arguments[0]).split() + arguments[1:]
-            basename = re.sub(r'^\W+', '', wds.pop(0))
-            basename = re.sub(r'\W+$', '', basename)
-            # DB(0, f'basename={basename} wds={wds}')
-            if basename in ('python', 'python2', 'python3', 'perl', 'bash', 'ruby',
-                    'sh', 'ksh', 'zsh') and wds:
-                script = os.path.basename(wds[0])
-                # DB(0, f'script={script} wds[0]={wds[0]}')
-                if script != wds[0]:
-                    basename = f'{basename}->{script}'
-                    del wds[0]
             self.exebasename = basename
-            self.cmdline = ' '.join([basename] + wds)
+            self.cmdline = cmdline
             self.cmdline_trunc = self.cmdline[0:ProcMem.max_cmd_len]
             # DB(0, f'basename={basename} cmdline_trunc={self.cmdline}')
         except Exception as exc:
@@ -341,231 +444,273 @@ class ProcMem:
 
     def set_key(self):
         """ TBD """
-        self.key = (self.cmdline_trunc if ProcMem.opts.groupby == 'cmd' else
-                self.exebasename if ProcMem.opts.groupby == 'exe' else self.pid)
-
-    def read_lines(self, filename):
-        """ Get the lines of the smaps """
-        lines = None
+        groupby = ProcMem.opts.groupby
+        self.key = (self.cmdline_trunc if groupby == 'cmd' else
+                self.exebasename if groupby == 'exe' else self.pid)
+
+    def read_data(self, filename, kept_fd=None):
+        """ Get the raw bytes of the smaps (or rollups) as a view into the
+        thread's read buffer; it is only valid until its next read.
+        A kept_fd is read from offset 0 (which regenerates the /proc file)
+        and left open."""
+        buf, total = getattr(ProcMem.tls, 'read_buf', None), 0
+        if buf is None:
+            buf = ProcMem.tls.read_buf = bytearray(256*1024)
         try:
-            with open(filename, encoding='utf-8') as fhandle:
-                lines = fhandle.read().splitlines()
-        except (PermissionError, FileNotFoundError) as exc:
+            fd = os.open(filename, os.O_RDONLY) if kept_fd is None else kept_fd
+            try:
+                while True:
+                    if total >= len(buf): # grow by doubling (and keep it)
+                        buf = ProcMem.tls.read_buf = buf + bytes(len(buf))
+                    cnt = os.preadv(fd, [memoryview(buf)[total:]], total)
+                    if cnt <= 0:
+                        break
+                    total += cnt
+            finally:
+                if kept_fd is None:
+                    os.close(fd)
+        except (PermissionError, FileNotFoundError, ProcessLookupError) as exc:
             # normal cases: not permitted or this is a race where the pid is terminating
             self.why_not = f'CannotReadLines({type(exc).__name__})'
+            return None
         except Exception as exc:
             # unexpected cases (probably a bug)
             if not self.opts.window:
                 print(f'ERROR: skip pid={self.pid}',
                       f'no-smaps-or-rollup-lines exc={type(exc).__name__}')
             self.why_not = f'CannotReadLines({type(exc).__name__})'
-        return lines
+            return None
+        return memoryview(buf)[:total]
 
-    def get_rollup_lines(self):
-        """Get the lines of the 'smaps_rollup' file for this PID"""
-        rollup_lines = []
+    def get_rollup_data(self):
+        """Get the raw contents of the 'smaps_rollup' file for this PID"""
+        rollup_data = b''
         try:
-            rollup_lines = self.read_lines(self.rollup_file)
+            rollup_data = self.read_data(self.rollup_file, self.rollup_fd)
         except Exception as exc:
-            rollup_lines = []
+            rollup_data = b''
             if DebugLevel:
                 DB(1, f'skip pid={self.pid} no-rollup-lines exc={type(exc).__name__}')
 
-        if not rollup_lines:
+        if not rollup_data:
             self.wanted = False
             self.why_not = 'CannotReadRollups'
         elif DebugLevel:
-            DB(3, f'pid={self.pid} {self.exebasename} #rollup_lines={len(rollup_lines)}')
+            DB(3, f'pid={self.pid} {self.exebasename} #rollup_bytes={len(rollup_data)}')
 
-        return rollup_lines
+        return rollup_data
 
-    def get_smaps_lines(self):
-        """Get the lines of the 'smaps' file for this PID"""
-        smaps_lines = []
+    def get_smaps_data(self):
+        """Get the raw contents of the 'smaps' file for this PID"""
+        smaps_data = b''
         try:
-            smaps_lines = self.read_lines(self.smaps_file)
+            smaps_data = self.read_data(self.smaps_file)
         except Exception as exc:
-            smaps_lines = []
+            smaps_data = b''
             if DebugLevel:
                 DB(1, f'skip pid={self.pid} no-smap-lines exc={type(exc).__name__}')
 
-        if not smaps_lines:
+        if not smaps_data:
             self.wanted = False
             self.why_not = 'CannotReadSmaps'
         else:
             if DebugLevel:
-                DB(1, f'pid={self.pid} {self.exebasename} #smaps_lines={len(smaps_lines)}')
-        return smaps_lines
-
-    def make_chunks(self, lines):
-        """ Parse the already smaps read lines."""
-        chunks = []
-        chunk = None
-        for idx, line in enumerate(lines):
-            match = self.section_pat.match(line)
-            if match:
-                if chunk:
-                    chunks.append(chunk)
-                chunk = SimpleNamespace(**ProcMem.chunk_dict)
-                chunk.beg = int(match.group(1), 16)
-                chunk.end = int(match.group(2), 16)
-                chunk.perms = match.group(3)
-                chunk.offset = int(match.group(4), 16)
-                chunk.item = match.group(8)
-                continue
-            match = self.item_pat.match(line)
-            if match:
-                tag = match.group(1)
-                val = int(match.group(2))
-                if tag == 'Size':
-                    chunk.size = val
-                elif tag == 'Rss':
-                    chunk.rss = val
-                elif tag.startswith('Shared'):
-                    chunk.shared += val
-                elif tag.startswith('Private'):
-                    chunk.private += val
-                elif tag == 'Swap':
-                    chunk.swap = val
-                elif tag == 'Pss':
-                    chunk.pss = val
-                continue
-            match = self.junk_pat.match(line)
-            if match:
+                DB(1, f'pid={self.pid} {self.exebasename} #smaps_bytes={len(smaps_data)}')
+        return smaps_data
+
+    def get_smaps_summary(self):
+        """Read, parse and summarize the smaps of this PID (None if unreadable).
+        Called from worker threads, so it must touch only this object."""
+        smaps_data = self.get_smaps_data()
+        if self.why_not:
+            return None
+        chunks = self.make_chunks(smaps_data)
+        self.categorize_chunks(chunks)
+        self.smaps_summary = self.summarize_chunks(chunks)
+        self.smaps_rollup_kb = self.rollup_kb
+        return self.smaps_summary
+
+    def is_smaps_current(self):
+        """Whether the last smaps summary is still good; i.e., the rollups
+        have not moved by the threshold since it was taken."""
+        return bool(self.smaps_summary and abs(self.rollup_kb - self.smaps_rollup_kb)
+                    < abs(ProcMem.opts.min_delta_kb))
+
+    def make_chunks(self, data):
+        """ Parse the already read smaps data into a ChunkTable.
+        Lines other than section headers and the tags of interest
+        are simply skipped over by the regex engine."""
+        chunks = ChunkTable()
+        cols = {tag: (getattr(chunks, attr), accumulate)
+                for tag, (attr, accumulate) in self.smaps_tags.items()}
+        for match in self.smaps_pat.finditer(data):
+            if match.lastindex == 7: # an item of the current section
+                if chunks.beg:
+                    col, accumulate = cols[match[6]]
+                    if accumulate:
+                        col[-1] += int(match[7])
+                    else:
+                        col[-1] = int(match[7])
                 continue
-            if not self.parse_err_cnt:
-                print(f'ERROR: cannot parse "{line}" [{self.smaps_file}:{idx+1}]')
-            self.parse_err_cnt += 1
-        if chunk:
-            chunks.append(chunk)
+            chunks.add_row(int(match[1], 16), int(match[2], 16), match[3],
+                    int(match[4], 16), match[5].decode('utf-8', 'replace'))
+        if not chunks:
+            if not ProcMem.parse_err_cnt:
+                print(f'ERROR: cannot parse any sections [{self.smaps_file}]')
+            ProcMem.parse_err_cnt += 1
         return chunks
 
     @staticmethod
     def make_summary_dict(pid=0, info=''):
         """ Make an object to summarize memory use of a PID or group """
-        summary = {
-                'cpu_pct': 0,
-                'pswap': 0,
-                'shSYSV': 0,
-                'shOth': 0, # e.g., memory mapped file
-                'stack': 0,
-                'text': 0,
-                'data': 0, # deprecated 'pseudo' (e.g., memory barrier) now in 'data'
-                'ptotal': 0,
-                'pss': 0,  # comes from rollups
-                'number': -pid if pid else 0, # count if positive; else -pid
-                'info': info,
-                }
+        summary = dict.fromkeys(ProcMem.summed_fields, 0)
+        summary['number'] = -pid if pid else 0 # count if positive; else -pid
+        summary['info'] = info
         return summary
 
-    def parse_rollups(self, lines):
-        """ Parse the already read lines."""
+    def parse_rollups(self, data):
+        """ Parse the already read data (e.g., b'Pss_Anon:   1234 kB') in place;
+        the few lines are walked with find() rather than split into a list."""
         summary = ProcMem.make_summary_dict()
-        for idx, line in enumerate(lines):
-            if not line.endswith('kB'):
-                continue
-            match = self.item_pat.match(line)
-            if match:
-                tag = match.group(1)
-                val = int(match.group(2))
-                if tag == 'Pss_Anon':
-                    summary['data'] += val
-                    summary['ptotal'] += val
-                elif tag == 'Pss_File':
-                    summary['text'] += val
-                    summary['ptotal'] += val
-                elif tag == 'Pss_Shmem':
-                    summary['shOth'] += val
+        tags, zram = self.rollup_tags, self.pmemstat.has_zram()
+        data = bytes(data) # a ~1KB copy out of the shared read buffer
+        pos = 0
+        while True:
+            colon = data.find(b':', pos)
+            if colon < 0:
+                break
+            eol = data.find(b'\n', colon)
+            if eol < 0:
+                eol = len(data)
+            field = tags.get(data[pos:colon])
+            if field and data.endswith(b' kB', colon, eol):
+                val = int(data[colon+1:eol-3])
+                summary[field] += val
+                if field != 'pswap' or zram:
                     summary['ptotal'] += val
-                elif tag == 'SwapPss':
-                    summary['pswap'] += val
-                    if self.pmemstat.has_zram():
-                        summary['ptotal'] += val
-                continue
-            print(f'ERROR: cannot parse "{line}" [{self.rollup_file}:{idx+1}]')
+            pos = eol + 1
         summary['pss'] = summary['ptotal'] # for consistency
         return summary
 
     def categorize_chunks(self, chunks):
         """ Analyze the chunks to categorize the memory """
-        for idx, chunk in enumerate(chunks):
-            chunk.eSize = chunk.size
-            if chunk.cat: # if already done, don't do again
+        # pylint: disable=too-many-locals
+        SHARED, WRITE, NONE = ChunkTable.SHARED, ChunkTable.WRITE, ChunkTable.NONE
+        NAMED, SYSV, STACK_ITEM = ChunkTable.NAMED, ChunkTable.SYSV, ChunkTable.STACK
+        SHSYSV, SHOTH, STACK, DATA, TEXT = range(1, 6) # per ChunkTable.cat_names
+        cat, esize, flags = chunks.cat, chunks.esize, chunks.perms_flags
+        beg, end, offset = chunks.beg, chunks.end, chunks.offset
+        size, rss, pss, private, swap = (chunks.size, chunks.rss, chunks.pss,
+                                         chunks.private, chunks.swap)
+        last = len(chunks) - 1
+        for idx in range(last + 1):
+            esize[idx] = size[idx]
+            if cat[idx]: # if already done, don't do again
                 continue
-
-            if 's' in chunk.perms:
-                if 'SYSV' in chunk.item:
-                    chunk.cat = 'shSYSV'
-                    # chunk.eSize = chunk.rss + chunk.swap
-                    chunk.eSize = chunk.pss
-                else:
-                    chunk.cat = 'shOth'
-                    chunk.eSize = chunk.pss
-            elif chunk.item and '[stack]' in chunk.item:
-                chunk.cat = 'stack'
-                chunk.eSize = chunk.private
-            elif (chunk.size == 4 and idx < len(chunks) - 1
-                    and chunk.offset == chunk.beg and not chunk.item
-                    and '---p' in chunk.perms):
+            flag = flags[idx] # the string tests were done once by add_row()
+
+            if flag & SHARED:
+                cat[idx] = SHSYSV if flag & SYSV else SHOTH
+                # esize[idx] = rss[idx] + swap[idx]
+                esize[idx] = pss[idx]
+            elif flag & STACK_ITEM:
+                cat[idx] = STACK
+                esize[idx] = private[idx]
+            elif (size[idx] == 4 and idx < last
+                    and offset[idx] == beg[idx] and not flag & NAMED
+                    and flag & NONE):
                     # stack seems to be 4K unwriteable immediately followed
                     # by something very huge like 10240 or 10236.
                     # The size is bogus ... replace the 'Size' with
                     # the 'Private' plus swapped
-                nchunk = chunks[idx+1]
-                if (chunk.end == nchunk.end
-                        and 'w' in nchunk.perms
-                        and not nchunk.item
-                        and nchunk.offset == nchunk.beg
-                        and nchunk.size >= 10000
-                        and nchunk.size <= 20000):
-                    chunk.eSize = 0
-                    chunk.cat = 'data' # was 'pseudo'
-                    nchunk.eSize = nchunk.private + nchunk.swap
-                    nchunk.cat = 'stack'
-            if not chunk.cat:
-                if '---' in chunk.perms:
-                    chunk.cat = 'data' # was 'pseudo'
-                    chunk.eSize = 0
-                elif 'w' in chunk.perms:
-                    chunk.cat = 'data'
-                    chunk.eSize = chunk.rss + chunk.swap
+                nidx = idx + 1
+                if (end[idx] == end[nidx]
+                        and flags[nidx] & WRITE
+                        and not flags[nidx] & NAMED
+                        and offset[nidx] == beg[nidx]
+                        and 10000 <= size[nidx] <= 20000):
+                    esize[idx] = 0
+                    cat[idx] = DATA # was 'pseudo'
+                    esize[nidx] = private[nidx] + swap[nidx]
+                    cat[nidx] = STACK
+            if not cat[idx]:
+                if flag & NONE:
+                    cat[idx] = DATA # was 'pseudo'
+                    esize[idx] = 0
+                elif flag & WRITE:
+                    cat[idx] = DATA
+                    esize[idx] = rss[idx] + swap[idx]
                 else:
-                    chunk.cat = 'text'
-                    chunk.eSize = chunk.pss + chunk.swap
+                    cat[idx] = TEXT
+                    esize[idx] = pss[idx] + swap[idx]
         if DebugLevel:
-            for chunk in chunks:
-                DB(6, '{self.pid} {self.exebasename} CHUNK:', chunk)
+            for idx in range(len(chunks)):
+                DB(6, f'{self.pid} {self.exebasename} CHUNK:', chunks.row_str(idx))
 
     def summarize_chunks(self, chunks):
         """ Accumulate the chunks into the summary of memory use for the PID """
         summary = self.make_summary_dict(self.pid)
-
-        for chunk in chunks:
-            if DebugLevel:
-                DB(5, f'{self.pid} {self.exebasename} BLK: {chunk.cat} eSize={chunk.eSize}'
-                    + f' size={chunk.size} {chunk.perms} {chunk.item}')
-            summary[chunk.cat] += chunk.eSize
-            summary['ptotal'] += chunk.eSize
-            summary['pswap'] += chunk.pswap
+        sum_by_cat = [0] * len(ChunkTable.cat_names)
+        for cat, esize in zip(chunks.cat, chunks.esize):
+            sum_by_cat[cat] += esize
+        for cat, name in enumerate(ChunkTable.cat_names):
+            if name:
+                summary[name] += sum_by_cat[cat]
+        summary['ptotal'] += sum(sum_by_cat)
+        if DebugLevel:
+            for idx in range(len(chunks)):
+                DB(5, f'{self.pid} {self.exebasename} BLK: {chunks.row_str(idx)}')
         # print(f'DB self.summaries[{key}]: {self.summaries[key]}')
         return summary
 
-    def prc_pid(self):
-        """Process one PID"""
+    def prep_pid(self):
+        """Start the turn of one PID in a loop; returns whether its
+        rollups are to be read."""
         self.alive = True
         self.is_changed = False
-        if not self.why_not and not self.cmdline:
+        # the cmdline is read once: the inode check in loop() replaces the
+        # ProcMem of a recycled PID, and a kernel thread (empty cmdline)
+        # stays one, so neither need be read again
+        if not self.why_not and not self.cmdline and not self.kernel:
             self.get_cmdline()
-            if not self.cmdline:
-                return
-        rollup_lines = []
-        if not self.why_not:
-            rollup_lines = self.get_rollup_lines()
+        if not self.cmdline or self.why_not:
+            return False
+        # keep the rollups open so each loop is a pread() w/o open()/close();
+        # opened here (not in the workers) so kept_fds needs no lock
+        if (self.rollup_fd is None and self.pmemstat.has_rollup
+                and ProcMem.kept_fds < ProcMem.max_kept_fds):
+            try:
+                self.rollup_fd = os.open(self.rollup_file, os.O_RDONLY)
+                ProcMem.kept_fds += 1
+            except OSError:
+                pass # read_data() opens it per read and reports any error
+        return True
+
+    def read_rollups(self):
+        """Read and parse the rollups of this PID (None if unreadable).
+        Called from worker threads, so it must touch only this object."""
+        if self.pmemstat.has_rollup:
+            rollup_data = self.get_rollup_data()
+            if self.why_not:
+                return None
+            rollup_summary = self.parse_rollups(rollup_data)
+        else: # pre-4.14 kernel; the smaps must stand in
+            if not self.get_smaps_summary():
+                return None
+            rollup_summary = dict(self.smaps_summary, number=0, info='')
+            rollup_summary['pss'] = rollup_summary['ptotal']
+        self.rollup_kb = rollup_summary['ptotal'] + rollup_summary['pswap']
+        if not self.pmemstat.has_rollup: # so that the summary counts as current
+            self.smaps_rollup_kb = self.rollup_kb
+        return rollup_summary
+
+    def prc_pid(self, rollup_summary):
+        """Add one PID (w/ the rollups read for it) into its group"""
+        if not self.cmdline:
+            return
         if self.why_not:
             DB(4, f'pid={self.pid} {self.exebasename} why_not={self.why_not}')
             return
-        self.is_changed = False
-        rollup_summary = self.parse_rollups(rollup_lines)
         if self.opts.cpu:
             rollup_summary['cpu_pct'] = self.cpu.percent
         group = self.pmemstat.get_group(self.key)
@@ -577,7 +722,32 @@ class ProcMem:
             group.summary = ProcMem.make_summary_dict(info=info)
             group.alive = True
         self.pmemstat.add_to_summary(rollup_summary, group.rollup_summary)
-        group.prcset.add(self)
+        group.prcset.append(self)
+
+####################################################################################
+###### ProcGroup class
+####################################################################################
+class ProcGroup:
+    """The PIDs aggregated under one key (exe, cmd, or pid) and their summaries."""
+    __slots__ = ('key', 'is_new', 'alive', 'why_not', 'is_changed', 'do_smaps',
+                 'prcset', 'o_rollup_summary', 'rollup_summary',
+                 'o_summary', 'summary', 'first_summary', 'growth_pct', 'delta_pss')
+
+    def __init__(self, key):
+        self.key = key
+        self.is_new = True
+        self.alive = False
+        self.why_not = None
+        self.is_changed = False
+        self.do_smaps = False
+        self.prcset = [] # the ProcMems of this loop
+        self.o_rollup_summary = None
+        self.rollup_summary = None
+        self.o_summary = None
+        self.summary = None
+        self.first_summary = None
+        self.growth_pct = 0.0
+        self.delta_pss = 0
 
 ######
 ####################################################################################
@@ -590,12 +760,25 @@ class PmemStat:
         self.opts = opts
         self.loop_num = 0
         self.debug = opts.debug
-        self.prcs = {}
+        self.prcs = {} # indexed by pid
         self.kernel_prcs = []
         self.groups = {} # indexed by group key (e.g., cmd)
         self.window = None
+        self.emit_body = None # bound Window.add_body (for the per-row path)
+        self.out_parts = [] # w/o window, the report text until written at once
+        self.executor = None # for overlapping the /proc reads (smaps, rollups)
+        # smaps_rollup came with Linux 4.14; probe once rather than per PID
+        self.has_rollup = os.path.exists('/proc/self/smaps_rollup')
+        # each PID may keep a stat fd (for CPU) and a rollup fd; hold the
+        # rollup ones to a third of the fd limit so neither runs dry
+        soft = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        ProcMem.max_kept_fds = (1 << 20 if soft == resource.RLIM_INFINITY
+                                else soft // 3)
         self.spin = OptionSpinner()
         self.number = 0  # line number for opts.numbers
+        self.body_cache = {} # formatted summary columns by their inputs
+        self.format_key = None # the options shaping those columns (set per loop)
+        self.columns, self.columns_key = (), None # column layout for format_key
         self.units, self.divisor, self.fwidth = 0, 0, 0
         self.mode = 'normal' # (or 'help' or ?'psi')
         setattr(opts, 'kill_mode', False) # pseudo option
@@ -638,19 +821,7 @@ class PmemStat:
         """Per group info."""
         group = self.groups.get(key, None)
         if not group:
-            group = SimpleNamespace(key=key,
-                    is_new=True,
-                    alive=False,
-                    why_not=None,
-                    is_changed=False,
-                    o_prcset=set(),
-                    prcset=set(),
-                    o_rollup_summary=None,
-                    rollup_summary=None,
-                    o_summary=None,
-                    summary=None,
-                    first_summary=None,
-                    growth_pct=0.0)
+            group = ProcGroup(key)
             self.groups[key] = group
             # DB(0, f'add group[{key}]')
         return group
@@ -672,8 +843,7 @@ class PmemStat:
                 group.is_new = False
                 group.alive = False
                 group.o_rollup_summary, group.rollup_summary = group.rollup_summary, None
-                if group.prcset:
-                    group.o_prcset, group.prcset = group.prcset, set()
+                group.prcset.clear() # refilled by prc_pid(); no new list per loop
                 group.is_changed = False
                 group.delta_pss = 0
 
@@ -682,6 +852,7 @@ class PmemStat:
             if regroup:
                 prc.set_key()
             if not prc.alive:
+                prc.close() # release its fds now, not at GC
                 del self.prcs[pid]
                 continue
             prc.alive = False
@@ -691,13 +862,10 @@ class PmemStat:
     def add_to_summary(summary, total):
         """ Add a summary memory use into a running total of memory use """
         if summary and total:
-            for key, val in summary.items():
-                if key in ('info',):
-                    pass
-                elif key in ('number',):
-                    total[key] += 1 if val <= 0 else val
-                elif isinstance(val, (int, float)):
-                    total[key] += val
+            for key in ProcMem.summed_fields: # fixed layout; no per-key tests
+                total[key] += summary[key]
+            number = summary['number']
+            total['number'] += 1 if number <= 0 else number
 
     def test_delta(self, group, summary, o_summary):
         """Check whether the group rollup or smaps summary exceeds threshold """
@@ -716,32 +884,70 @@ class PmemStat:
                 DB(2, f'{group.key} ~pss {delta_pss}KB thresh={thresh}')
         return is_over, delta_pss
 
-    def prc_group(self, group):
-        """Process on group"""
-        do_smaps = False
+    def wants_smaps(self, group):
+        """Whether the group's rollups changed enough to warrant reading smaps"""
+        if self.opts.others:
+            return False
         if group.o_rollup_summary:
             do_smaps, _ = self.test_delta(
                     group, group.rollup_summary, group.o_rollup_summary)
-        else:
-            do_smaps = True
-        if self.opts.others:
-            do_smaps = False
+            return do_smaps
+        return True
+
+    def get_executor(self):
+        """The thread pool for overlapping the /proc reads (made on first use)"""
+        if not self.executor:
+            self.executor = ThreadPoolExecutor(
+                    max_workers=min(8, os.cpu_count() or 1),
+                    thread_name_prefix='procio')
+        return self.executor
+
+    def get_rollup_summaries(self, prcs):
+        """Read the rollups of the given PIDs, overlapping the reads in the
+        thread pool if there are CPUs to overlap them on; returns
+        {prc: summary-or-None}."""
+        if len(prcs) < 2 or (os.cpu_count() or 1) < 2:
+            return {prc: prc.read_rollups() for prc in prcs}
+        return dict(zip(prcs, self.get_executor().map(ProcMem.read_rollups, prcs)))
+
+    def get_smaps_summaries(self, prcs):
+        """Summarize the smaps of the given PIDs, overlapping their reads
+        in a thread pool; returns {prc: summary-or-None}.
+        PIDs whose own rollups have barely moved reuse their last summary."""
+        summaries, stale = {}, []
+        for prc in prcs:
+            if prc.is_smaps_current():
+                summaries[prc] = prc.smaps_summary
+            else:
+                stale.append(prc)
+        if len(stale) < 2:
+            summaries.update((prc, prc.get_smaps_summary()) for prc in stale)
+            return summaries
+        summaries.update(zip(stale, self.get_executor().map(
+                ProcMem.get_smaps_summary, stale)))
+        return summaries
+
+    def prc_group(self, group, smaps_summaries):
+        """Process on group"""
+        do_smaps = group.do_smaps
 
-        for prc in list(group.prcset):
-            group.summary['info'] = (f'{prc.exebasename}' if self.opts.groupby == 'exe'
-                    else f'{prc.cmdline_trunc}' if self.opts.groupby == 'cmd'
+        if group.prcset:
+            prc, groupby = group.prcset[-1], self.opts.groupby
+            group.summary['info'] = (f'{prc.exebasename}' if groupby == 'exe'
+                    else f'{prc.cmdline_trunc}' if groupby == 'cmd'
                     else f'{prc.pid} {prc.cmdline_trunc}')
-            if do_smaps:
-                global read_smaps
+        if do_smaps:
+            global read_smaps
+            dropped = False
+            for prc in group.prcset:
                 read_smaps += 1
-                smaps_lines = prc.get_smaps_lines()
+                summary = smaps_summaries.get(prc)
                 if prc.why_not:
-                    group.prcset.remove(prc)
+                    dropped = True
                     continue
-                chunks = prc.make_chunks(smaps_lines)
-                prc.categorize_chunks(chunks)
-                summary = prc.summarize_chunks(chunks)
                 self.add_to_summary(summary, group.summary)
+            if dropped:
+                group.prcset = [prc for prc in group.prcset if not prc.why_not]
         if self.opts.others:
             self.add_to_summary(group.rollup_summary, group.summary)
         group.summary['pss'] = group.rollup_summary['ptotal']
@@ -796,61 +1002,88 @@ class PmemStat:
 
     def pr_summary(self, lead, summary, attr=None, to_head=False):
         """Print a summary of memory use"""
-        body = ''
-        others, exclusions = self.pr_exclusions()
-        others_mb = 0
-        if self.opts.numbers:
-            body += f'{self.number:>4}'
+        prefix = f'{self.number:>4}' if self.opts.numbers else ''
         self.number += 1
-        for item, value in summary.items():
-            if item not in exclusions:
-                if item in ('cpu_pct', ):
-                    body += f'{value:>{self.fwidth}.1f}'
-                    continue
-                mbytes = int(round(value*1024/self.divisor))
-                if item in others:
-                    others_mb += mbytes
-                    if item != others[0]:
-                        continue
-                    mbytes = others_mb
-                if self.divisor > 1:
-                    body += f'{mbytes:>{self.fwidth},}'
-                else:
-                    body += f'{human(mbytes):>{self.fwidth}}'
+        # steady rows format the same every loop, so keep the recent ones
+        key = (self.format_key, tuple(summary.values()))
+        body = self.body_cache.get(key, None)
+        if body is None:
+            body = self.format_summary(summary)
+            if len(self.body_cache) >= 4096:
+                self.body_cache.clear()
+            self.body_cache[key] = body
         num = summary['number']
-        self.emit(f'{body} {lead} '
-                  + (f'{-num}' if num <= 0 else f'{num}x')
-                  + ' ' + summary['info'], attr=attr, to_head=to_head)
+        line = (f'{prefix}{body} {lead} ' + (f'{-num}' if num <= 0 else f'{num}x')
+                + ' ' + summary['info'])
+        if self.emit_body and not to_head: # the common case; skip emit()
+            self.emit_body(line, attr=attr)
+        else:
+            self.emit(line, attr=attr, to_head=to_head)
+
+    def get_columns(self):
+        """Get the displayed columns as (heading, fields) pairs; fields
+        is None for the cpu_pct column and several fields are summed
+        into the 'other' column. Rebuilt only when the options change."""
+        if self.columns_key != self.format_key:
+            others, exclusions = self.pr_exclusions()
+            columns = []
+            for item in ProcMem.summed_fields: # 'number' and 'info' are never columns
+                if item in exclusions:
+                    continue
+                if item in ('cpu_pct', ):
+                    columns.append((item, None))
+                elif item not in others:
+                    columns.append((item, (item,)))
+                elif item == others[0]:
+                    columns.append(('other', tuple(x for x in others
+                                                   if x not in exclusions)))
+            self.columns, self.columns_key = tuple(columns), self.format_key
+        return self.columns
+
+    def format_summary(self, summary):
+        """Format the numeric columns of a summary of memory use"""
+        body = ''
+        fwidth, divisor = self.fwidth, self.divisor
+        for _, fields in self.get_columns():
+            if fields is None:
+                body += f'{summary["cpu_pct"]:>{fwidth}.1f}'
+                continue
+            mbytes = 0
+            for item in fields:
+                mbytes += int(round(summary[item]*1024/divisor))
+            if divisor > 1:
+                body += f'{mbytes:>{fwidth},}'
+            else:
+                body += f'{human(mbytes):>{fwidth}}'
+        return body
+
+    meminfo_keys = {b'MemTotal:': 'MemTotal', b'MemAvailable:': 'MemAvailable',
+                    b'Dirty:': 'Dirty', b'Shmem:': 'Shmem'}
 
     @staticmethod
     def get_meminfo():
         """Get most vital stats from /proc/meminfo'"""
         meminfofile = '/proc/meminfo'
         meminfoKB = {'MemTotal': 0, 'MemAvailable': 0, 'Dirty':0, 'Shmem':0}
-        keys = list(meminfoKB.keys())
+        wanted = PmemStat.meminfo_keys
+        missing = set(wanted)
 
-        with open(meminfofile, encoding='utf-8') as fileh:
-            for line in fileh:
-                match = re.match(r'^([^:]+):\s+(\d+)\s*kB', line)
-                if not match:
+        with open(meminfofile, 'rb') as fileh:
+            for line in fileh: # e.g., b'MemTotal:       16310812 kB\n'
+                parts = line.split(None, 2)
+                if not parts or parts[0] not in missing:
                     continue
-                key, value = match.group(1), int(match.group(2))
-                if key not in keys:
-                    continue
-                meminfoKB[key] = value
-                keys.remove(key)
-                if not keys:
+                meminfoKB[wanted[parts[0]]] = int(parts[1])
+                missing.discard(parts[0])
+                if not missing:
                     break
+        keys = [wanted[key] for key in missing]
         assert not keys, f'ALERT: cannot get vitals ({keys}) from {meminfofile}'
         return meminfoKB
 
     def loop(self, now, is_first, regroup=False):
         """one loop thru all pids"""
         # pylint: disable=too-many-branches
-        def sort_kernel_prcs():
-            self.kernel_prcs = sorted(self.kernel_prcs, reverse=True,
-                  key=lambda x: x.cpu.percent if x.cpu else 0)
-
         def pr_top_of_report(appKB):
             nonlocal self, meminfoKB, wanted_prcs, total_user_pids, kernel_cpu
             windowed = bool(self.window)
@@ -904,20 +1137,22 @@ class PmemStat:
             elif self.opts.cpu: # second line if reporting cpu
                 resume = False
                 leader = f'{kernel_cpu:8.1f}/ker'
-                sort_kernel_prcs()
-                for prc in self.kernel_prcs[0:2]:
+                # just the top two are shown, so no need to sort them all
+                for prc in heapq.nlargest(2, self.kernel_prcs,
+                        key=lambda x: x.cpu.percent if x.cpu else 0):
                     nickname = prc.cpu.get_nickname()
                     leader += f'    {prc.cpu.percent:.2f}% {nickname}'
                 self.emit(leader, to_head=True, resume=resume)
 
             # pylint: disable=too-many-branches
         self.loop_num += 1
+        # options only change between loops; snapshot what the hot paths use
+        self.format_key = (self.divisor, self.opts.cpu, self.opts.others, self.debug)
         meminfoKB = self.get_meminfo()
         self.zram_projector.compute_effective(meminfoKB)
         total_user_pids = 0
         total_kernel_pids = 0
         kernel_cpu = 0
-        all_pids = []
         wanted_prcs = {}
         self.kernel_prcs = []
 
@@ -936,18 +1171,15 @@ class PmemStat:
             self.window.render()
             self.window.clear()
 
-        with os.scandir('/proc') as it:
-            for entry in it:
-                # if re.match(r'^\d+$', entry.name):
-                if entry.name.isdigit():
-                    all_pids.append(entry.name)
-
         prcs = []
-        for pid in all_pids:
+        for pid, ino in list_pid_dirs():
             ## print(f'DBDB pid={pid} self.opts.pids={opts.pids}')
             prc = self.prcs.get(pid, None)
-            if not prc:
-                prc = ProcMem(int(pid))
+            if not prc or prc.inode != ino: # new (or recycled) PID
+                if prc:
+                    prc.close()
+                prc = ProcMem(pid)
+                prc.inode = ino
                 self.prcs[pid] = prc
             else:
                 prc.is_new = False
@@ -956,18 +1188,20 @@ class PmemStat:
         # do cpu together that stats are consistent
         if self.opts.cpu:
             SysStat.refresh()
-            for prc in prcs:
-                if prc.wanted or prc.kernel:
-                    percent = prc.refresh_cpu()
-                if prc.kernel:
-                    kernel_cpu += percent
-                    total_kernel_pids += 1
-                    self.kernel_prcs.append(prc)
-                else:
-                    total_user_pids += 1
-
+            # one batch (and one timestamp) for all the /proc/<pid>/stat reads
+            CpuSmooth.refresh_all([prc.get_cpu() for prc in prcs
+                                   if prc.wanted or prc.kernel])
+            # the per-kernel-PID work is a column pass, not a branch per PID
+            self.kernel_prcs = [prc for prc in prcs if prc.kernel]
+            kernel_cpu = sum(prc.cpu.percent for prc in self.kernel_prcs)
+            total_kernel_pids = len(self.kernel_prcs)
+            total_user_pids = len(prcs) - total_kernel_pids
+
+        # the rollup reads are independent, so they may overlap; the adding
+        # into groups stays serial (and in PID order)
+        rollups = self.get_rollup_summaries([prc for prc in prcs if prc.prep_pid()])
         for prc in prcs:
-            prc.prc_pid()
+            prc.prc_pid(rollups.get(prc))
             pid = prc.pid
             ## if str(pid) in opts.pids:
                 ## print(f'DBDB pid={pid} dir={vars(prc)}')
@@ -984,9 +1218,16 @@ class PmemStat:
         # for each group, if it has changed, sum all the smaps for the group
         # if the group rollup_summary indicates enough change
         grand_summary = ProcMem.make_summary_dict(info=f'--TOTALS in {self.units} --')
+        smaps_prcs = []
+        for group in self.groups.values():
+            if group.alive:
+                group.do_smaps = self.wants_smaps(group)
+                if group.do_smaps:
+                    smaps_prcs.extend(group.prcset)
+        smaps_summaries = self.get_smaps_summaries(smaps_prcs)
         for group in self.groups.values():
             if group.alive:
-                self.prc_group(group)
+                self.prc_group(group, smaps_summaries)
                 self.add_to_summary(group.summary, grand_summary)
 
         # detect changed group on basis of differing PIDs contributing
@@ -999,40 +1240,32 @@ class PmemStat:
         pr_top_of_report(appKB=grand_summary['ptotal'])
 
         header = ''
-        others, exclusions = self.pr_exclusions()
         self.number = 0
         if self.opts.numbers:
             header += '   #'
-        for item in grand_summary:
-            if item not in exclusions:
-                if item in others:
-                    if item != others[0]:
-                        continue
-                    item = 'other'
-                header += f'{item:>{self.fwidth}}'
+        for heading, _ in self.get_columns():
+            header += f'{heading:>{self.fwidth}}'
         self.emit(f'{header}   key/info'
                 + f' ({self.opts.groupby} by {self.get_sortby()})',
                 to_head=True, attr=curses.A_BOLD)
         self.pr_summary('T', grand_summary, to_head=True)
 
-        alive_groups = {}
-        for key, group in self.groups.items():
+        alive_groups = [] # sorted in place below; no key => group lookups
+        for group in self.groups.values():
             if group.alive:
-                alive_groups[key] = group
+                alive_groups.append(group)
                 if not group.summary:
                     DB(0, 'no summary:', str(group))
 
-        if self.get_sortby() == 'cpu':
-            sorted_keys = sorted(alive_groups.keys(), key=lambda x:
-                (-round(alive_groups[x].summary['cpu_pct'], 1),
-                    str(alive_groups[x].key).lower()))
-        elif self.get_sortby() == 'name':
-            sorted_keys = sorted(alive_groups.keys(),
-                key=lambda x: str(alive_groups[x].key).lower())
+        rise_to_top, sortby = self.opts.rise_to_top, self.get_sortby()
+        if sortby == 'cpu':
+            alive_groups.sort(key=lambda x:
+                (-round(x.summary['cpu_pct'], 1), str(x.key).lower()))
+        elif sortby == 'name':
+            alive_groups.sort(key=lambda x: str(x.key).lower())
         else:
-            sorted_keys = sorted(alive_groups.keys(),
-                key=lambda x: (alive_groups[x].is_changed and self.opts.rise_to_top,
-                               alive_groups[x].summary['ptotal']), reverse=True)
+            alive_groups.sort(key=lambda x: (x.is_changed and rise_to_top,
+                               x.summary['ptotal']), reverse=True)
 
         limit = self.window.scroll_view_size if self.is_fit_opted() else 1000000
         ptotal_limit = (grand_summary['ptotal'] * self.opts.top_pct / 100) * 1.001
@@ -1040,25 +1273,40 @@ class PmemStat:
         running_summary = ProcMem.make_summary_dict(info='---- RUNNING ----')
         shown_cnt = 0
         self.groups_by_line = {}
-        for key in sorted_keys:
-            group = alive_groups[key]
+        search, window = self.opts.search, self.window
+        keep_others = is_first or self.opts.window
+        # row attrs by state (no highlighting of the first report)
+        normal_attr = curses.A_NORMAL
+        changed_attr = normal_attr if is_first else curses.A_REVERSE
+        rest = len(alive_groups) # where the groups that cannot be shown start
+        for idx, group in enumerate(alive_groups):
+            if shown_cnt >= limit-1: # the view is full
+                rest = idx
+                break
             self.add_to_summary(group.summary, running_summary)
-            if (self.opts.search in group.summary['info'] and
-              shown_cnt < limit-1 and running_summary['ptotal'] <= ptotal_limit):
-                if group.alive and (group.is_new or group.is_changed or self.window):
-                    attr = curses.A_REVERSE if group.is_new or group.is_changed else None
-                    attr = None if is_first else attr
-                    if self.window:
-                        self.groups_by_line[self.window.body.row_cnt] = group
+            if running_summary['ptotal'] > ptotal_limit: # only grows from here
+                rest = idx
+                break
+            if search in group.summary['info']:
+                if group.alive and (group.is_new or group.is_changed or window):
+                    attr = changed_attr if group.is_new or group.is_changed else normal_attr
+                    if window:
+                        self.groups_by_line[window.body.row_cnt] = group
                     self.pr_summary('A' if group.is_new
                         else f'{group.delta_pss:+,}K' if group.is_changed
                         else ' ', group.summary, attr=attr)
                     shown_cnt += 1
                     # DB(0, f'obj: {vars(obj)}')
-            elif is_first or self.opts.window:
+            elif keep_others:
                 if not others_summary:
                     others_summary = ProcMem.make_summary_dict(info='---- OTHERS ----')
                 self.add_to_summary(group.summary, others_summary)
+        if keep_others and rest < len(alive_groups): # the rest just add up
+            if not others_summary:
+                others_summary = ProcMem.make_summary_dict(info='---- OTHERS ----')
+            add_to_summary = self.add_to_summary
+            for group in alive_groups[rest:]:
+                add_to_summary(group.summary, others_summary)
         if others_summary:
             self.pr_summary('O',  others_summary)
 
@@ -1069,6 +1317,11 @@ class PmemStat:
                 self.pr_summary('x', group.o_summary)
         if not self.window:
             self.emit('')
+            # one write per report, not one per line (stdout on a tty flushes
+            # at each newline and every line of the report starts with one)
+            sys.stdout.write(''.join(self.out_parts))
+            sys.stdout.flush()
+            self.out_parts.clear()
 
     def emit(self, line, to_head=False, attr=None, resume=False):
         """ Emit a line of the report"""
@@ -1079,7 +1332,7 @@ class PmemStat:
             else:
                 self.window.add_body(line, attr=attr, resume=resume)
         else:
-            print(('' if resume else '\n') + line, end='')
+            self.out_parts.append(line if resume else '\n' + line)
 
     def help_screen(self):
         """Populate help screen"""
@@ -1155,6 +1408,7 @@ class PmemStat:
 
         keys_we_handle =  [ord('K'), curses.KEY_ENTER, 10] + list(self.spin.keys)
         self.window = Window(head_line=True, keys=keys_we_handle)
+        self.emit_body = self.window.add_body
         is_first = True
         was_groupby, regroup = self.opts.groupby, True
         was_others = self.opts.others
@@ -1163,7 +1417,11 @@ class PmemStat:
                 self.window.set_pick_mode(False)
                 self.help_screen()
                 self.window.render()
-                do_key(self.window.prompt(self.opts.loop_secs))
+                key = self.window.prompt(self.opts.loop_secs)
+                while key is None: # the help page changes only by keys, so
+                    self.window.render() # just redraw (if resized) until one
+                    key = self.window.prompt(self.opts.loop_secs)
+                do_key(key)
                 self.window.clear()
             elif self.mode == 'normal':
                 regroup = bool(was_groupby != self.opts.groupby)